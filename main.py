@@ -1,43 +1,85 @@
-from src.api_hh import HeadHunterAPI
-from src.currency import update_currency_rates
-from src.db_setup import create_database, create_tables
-from src.loader import insert_data
-from src.db_manager import DBManager
-from src.employer_selector import choose_employer
-from src.output_utils import (
-    print_companies, print_vacancies,
-    print_avg_salary, print_higher_salary_vacancies, print_keyword_vacancies
-)
+import argparse
+import sys
 
 
-def main() -> None:
-    """Точка входа в приложение.
+def run_pipeline() -> None:
+    """Полный цикл загрузки и просмотра данных.
 
     Последовательно выполняет шаги:
     1. Создаёт базу данных и таблицы.
     2. Загружает курсы валют.
     3. Запрашивает список работодателей у пользователя (или использует дефолтный).
-    4. Скачивает данные о работодателях и вакансиях с hh.ru.
-    5. Сохраняет данные в БД.
+    4. Скачивает данные о работодателях и вакансиях с hh.ru
+       (с фильтрами поиска HH_* из .env, если они заданы).
+    5. Сохраняет данные в БД (при LOAD_MODE=reload — через staging-таблицы
+       с атомарной подменой, при LOAD_MODE=merge — только изменения).
+       При ENRICH_DETAILS=1 догружает подробности новых и изменённых вакансий,
+       при SNAPSHOTS=1 дописывает снимок вакансий в историю.
     6. Предоставляет интерфейс для работы с БД:
        - список компаний и количество вакансий,
        - все вакансии,
-       - средняя зарплата,
+       - средняя зарплата, медиана и перцентили,
+       - гистограмма и зарплаты по компаниям,
        - вакансии выше средней,
        - вакансии по ключевому слову.
     """
+    # модули импортируются здесь, чтобы режим отчёта не тратил время на их загрузку
+    from src.api_hh import HeadHunterAPI
+    from src.config import load_search_filters, load_settings
+    from src.currency import update_currency_rates
+    from src.db_setup import (
+        create_database, create_tables, create_staging_tables, swap_staging_tables,
+        create_snapshot_table,
+    )
+    from src.loader import insert_data, merge_data, notify_data_loaded, save_snapshot
+    from src.db_manager import DBManager
+    from src.enrichment import enrich_vacancies
+    from src.employer_selector import choose_employer
+    from src.output_utils import (
+        print_companies, print_vacancies,
+        print_avg_salary, print_higher_salary_vacancies, print_keyword_vacancies,
+        print_salary_percentiles, print_salary_histogram,
+        print_salary_stats_by_employer,
+    )
+
+    settings = load_settings()
+    load_mode = settings["load_mode"]
+    partitions = settings["vacancy_partitions"]
+
     # Создаём БД и таблицы
     create_database()
-    create_tables()
+    create_tables(reset=load_mode == "reset", partitions=partitions)
+    if settings["snapshots"]:
+        create_snapshot_table()
     update_currency_rates()
 
     # выбор работодателей
     employers = choose_employer()
 
     # Скачиваем данные и загружаем в БД
-    hh = HeadHunterAPI(employers)
+    hh = HeadHunterAPI(
+        employers,
+        filters=load_search_filters(),
+        partition=settings["crawl_partition"],
+    )
     data = hh.collect_data()
-    insert_data(data)
+    if load_mode == "reload":
+        create_staging_tables(partitions)
+        insert_data(data, staging=True)
+        swap_staging_tables()
+    elif load_mode == "merge":
+        merge_data(data)
+    else:
+        insert_data(data)
+
+    # Подробности вакансий: только новые и изменившиеся
+    if settings["enrich_details"]:
+        enrich_vacancies(hh, max_workers=settings["enrich_workers"])
+
+    # История: снимок текущего состояния и удаление старых месяцев
+    if settings["snapshots"]:
+        save_snapshot(settings["snapshot_retention_months"])
+    notify_data_loaded()
 
     # Работа через DBManager
     with DBManager() as db:
@@ -45,10 +87,39 @@ def main() -> None:
         print_companies(db.get_companies_and_vacancies_count(), limit=limit)
         print_vacancies(db.get_all_vacancies(), limit=limit)
         print_avg_salary(db.get_avg_salary())
+        print_salary_percentiles(db.get_salary_percentiles())
+        print_salary_histogram(db.get_salary_histogram())
+        print_salary_stats_by_employer(db.get_salary_stats_by_employer(), limit=limit)
         print_higher_salary_vacancies(db.get_vacancies_with_higher_salary(), limit=limit)
         keyword = "Python"
         print_keyword_vacancies(db.get_vacancies_with_keyword(keyword), keyword, limit=limit)
 
 
+def main() -> None:
+    """Точка входа в приложение.
+
+    Без аргументов выполняет полный цикл `run_pipeline`. С `--report NAME`
+    выводит один отчёт по уже загруженным данным: без создания базы, сверки
+    таблиц и обновления курсов валют, через одно соединение с БД.
+    """
+    parser = argparse.ArgumentParser(description="Вакансии hh.ru в PostgreSQL")
+    parser.add_argument(
+        "--report",
+        help="вывести отчёт и завершиться: companies, vacancies, higher_salary, "
+        "keyword, avg_salary, percentiles, histogram, by_employer, by_currency, "
+        "salary_trend, count_trend",
+    )
+    parser.add_argument("--keyword", help="ключевое слово для отчёта keyword")
+    parser.add_argument("--format", choices=["table", "csv", "json"], default="table")
+    parser.add_argument("--limit", type=int, help="максимальное количество строк")
+    args = parser.parse_args()
+
+    if args.report:
+        from src.report import run_report
+
+        sys.exit(run_report(args.report, args.format, args.keyword, args.limit))
+    run_pipeline()
+
+
 if __name__ == "__main__":
     main()
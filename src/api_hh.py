@@ -1,48 +1,262 @@
 import random
+import threading
 import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
 from typing import Any
+from urllib.parse import parse_qs, urlparse
 
 import requests
 
 
+class RateLimiter:
+    """Общий для всех потоков лимит частоты запросов."""
+
+    def __init__(self, min_interval: float) -> None:
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_time = 0.0
+
+    def wait(self) -> None:
+        """Ждёт, пока не освободится очередной слот для запроса."""
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_time)
+            self._next_time = start + self.min_interval
+        time.sleep(start - now)
+
+
+class LatencyTracker:
+    """Скользящее окно длительностей успешных запросов."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20) -> None:
+        self.min_samples = min_samples
+        self._samples: deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        """Добавляет длительность запроса."""
+        with self._lock:
+            self._samples.append(seconds)
+
+    def p95(self) -> float | None:
+        """Возвращает 95-й перцентиль или None, пока наблюдений мало."""
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[int(len(ordered) * 0.95) - 1]
+
+
+class CircuitOpenError(RuntimeError):
+    """Запросы к API остановлены: доля ошибок превысила порог."""
+
+
+class CircuitBreaker:
+    """Останавливает запросы при высокой доле ошибок и возобновляет их сам.
+
+    Если среди последних `window` запросов доля ошибок достигла `threshold`,
+    цепь размыкается и запросы сразу отклоняются. Через `cooldown` секунд
+    пропускается один пробный запрос, остальные отклоняются до его результата:
+    успех замыкает цепь, ошибка снова её размыкает.
+    """
+
+    def __init__(
+        self, threshold: float = 0.5, window: int = 20, cooldown: float = 60.0
+    ) -> None:
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._results: deque[bool] = deque(maxlen=window)
+        self._opened_at: float | None = None
+        self._half_open = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Проверяет, можно ли выполнить запрос."""
+        with self._lock:
+            if self._half_open:
+                return False
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at >= self.cooldown:
+                self._opened_at = None
+                self._half_open = True
+                return True
+            return False
+
+    def retry_after(self, poll: float = 1.0) -> float:
+        """Возвращает, через сколько секунд имеет смысл снова вызвать `allow`.
+
+        Args:
+            poll: интервал опроса, пока выполняется пробный запрос.
+        """
+        with self._lock:
+            if self._half_open:
+                return poll
+            if self._opened_at is None:
+                return 0.0
+            return max(0.0, self._opened_at + self.cooldown - time.monotonic())
+
+    def record(self, ok: bool) -> None:
+        """Учитывает результат запроса."""
+        with self._lock:
+            if self._half_open:
+                self._half_open = False
+                self._results.clear()
+                if not ok:
+                    self._opened_at = time.monotonic()
+                return
+            self._results.append(ok)
+            errors = self._results.count(False)
+            if (
+                len(self._results) == self._results.maxlen
+                and errors / len(self._results) >= self.threshold
+            ):
+                self._opened_at = time.monotonic()
+                self._results.clear()
+
+
 class HeadHunterAPI:
     BASE_URL = "https://api.hh.ru"
-
-    def __init__(self, employers: list[str]) -> None:
+    # допустимая недостача кластеров относительно found при обходе по срезам
+    FACET_TOLERANCE = 0.01
+    FACET_MIN_SHORTFALL = 20
+
+    def __init__(
+        self,
+        employers: list[str],
+        filters: dict[str, Any] | None = None,
+        partition: str = "time",
+        timeout: tuple[float, float] = (5.0, 20.0),
+        hedge: bool = True,
+    ) -> None:
+        """Создаёт клиент API hh.ru.
+
+        Args:
+            employers: id работодателей.
+            filters: параметры поиска `/vacancies` (text, area, professional_role,
+                salary, only_with_salary, experience), которые передаются в API
+                как есть, чтобы фильтрация выполнялась на стороне hh.ru.
+            partition: как обходить ограничение в 2000 результатов:
+                "time" — только временными окнами, "area" или
+                "professional_role" — сначала по срезам этого параметра.
+            timeout: таймауты (подключение, чтение) одного запроса в секундах.
+            hedge: дублировать запрос, если ответ не пришёл за наблюдаемый p95.
+        """
         self.employers = employers
+        self.filters = filters or {}
+        self.partition = partition
         self.session = requests.Session()
         self.session.headers.update(
             {"User-Agent": "Mozilla/5.0 (compatible; HH-Parser/1.0)"}
         )
+        # базовая задержка между запросами, общая для параллельных потоков
+        self.rate_limiter = RateLimiter(min_interval=0.2)
+        self.timeout = timeout
+        self.hedge = hedge
+        self.latency = LatencyTracker()
+        self.breaker = CircuitBreaker()
+        # сколько один вызов `_get` готов ждать замыкания цепи в сумме
+        self.max_circuit_wait = 300.0
+        # выставляется, когда один из вызовов не дождался замыкания цепи:
+        # остальные при разомкнутой цепи сразу выбрасывают CircuitOpenError,
+        # а не ждут `max_circuit_wait` каждый; сбрасывается первым успешным ответом
+        self._circuit_gave_up = threading.Event()
+        self._hedge_pool = ThreadPoolExecutor(max_workers=16)
+
+    def _timed_get(self, url: str, params: dict[str, Any] | None) -> requests.Response:
+        """Выполняет один запрос с таймаутом и запоминает его длительность."""
+        start = time.monotonic()
+        response = self.session.get(url, params=params, timeout=self.timeout)
+        if response.ok:
+            self.latency.record(time.monotonic() - start)
+        return response
+
+    def _send(self, url: str, params: dict[str, Any] | None) -> requests.Response:
+        """Отправляет запрос, при долгом ответе — дублирует его (hedged request).
+
+        Если ответ не пришёл за наблюдаемый p95, отправляется второй такой же
+        запрос и используется первый успешный ответ.
+        """
+        delay = self.latency.p95() if self.hedge else None
+        if delay is None:
+            return self._timed_get(url, params)
+
+        futures = [self._hedge_pool.submit(self._timed_get, url, params)]
+        done, _ = wait(futures, timeout=delay)
+        if not done:
+            self.rate_limiter.wait()
+            futures.append(self._hedge_pool.submit(self._timed_get, url, params))
+
+        pending = set(futures)
+        error: Exception | None = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+        raise error
 
     def _get(self, url: str, params: dict[str, Any] | None = None) -> dict[str, Any]:
-        """Выполняет GET-запрос с retry, throttling и backoff."""
+        """Выполняет GET-запрос с retry, throttling и backoff.
+
+        Каждая попытка ограничена таймаутом, а пауза между попытками —
+        `max_backoff`, поэтому время одного вызова ограничено сверху. При
+        разомкнутом CircuitBreaker ждёт его замыкания, но не дольше
+        `max_circuit_wait` секунд, после чего выбрасывает CircuitOpenError.
+        Пока после этого не пришёл успешный ответ, следующие вызовы при
+        разомкнутой цепи выбрасывают CircuitOpenError без ожидания.
+        Для несуществующих ресурсов (404) возвращает пустой словарь.
+        """
         retries = 8
-        base_delay = 0.2  # базовая задержка между запросами
+        max_backoff = 30.0
+        circuit_wait = 0.0
 
         for attempt in range(retries):
+            while not self.breaker.allow():
+                delay = self.breaker.retry_after()
+                if (
+                    self._circuit_gave_up.is_set()
+                    or circuit_wait + delay > self.max_circuit_wait
+                ):
+                    self._circuit_gave_up.set()
+                    raise CircuitOpenError(
+                        f"⛔ Слишком много ошибок API, запросы приостановлены: {url}"
+                    )
+                time.sleep(delay)
+                circuit_wait += delay
             try:
-                response = self.session.get(url, params=params)
+                self.rate_limiter.wait()
+                response = self._send(url, params)
+
+                if response.status_code == 404:
+                    self.breaker.record(True)
+                    self._circuit_gave_up.clear()
+                    return {}
 
                 # если временные ошибки или блокировка
                 if response.status_code in (500, 502, 503, 504, 429, 403):
-                    wait = (2**attempt) + random.random()
+                    self.breaker.record(False)
+                    wait_time = min(max_backoff, 2**attempt + random.random())
                     print(
                         f"⚠️ Ошибка {response.status_code} при запросе {url}, "
-                        f"повтор через {wait:.1f} сек..."
+                        f"повтор через {wait_time:.1f} сек..."
                     )
-                    time.sleep(wait)
+                    time.sleep(wait_time)
                     continue
 
                 response.raise_for_status()
-                time.sleep(base_delay)  # пауза между успешными запросами
+                self.breaker.record(True)
+                self._circuit_gave_up.clear()
                 return response.json()
 
             except requests.RequestException as e:
-                wait = (2**attempt) + random.random()
-                print(f"⚠️ Ошибка {e}, повтор через {wait:.1f} сек...")
-                time.sleep(wait)
+                self.breaker.record(False)
+                wait_time = min(max_backoff, 2**attempt + random.random())
+                print(f"⚠️ Ошибка {e}, повтор через {wait_time:.1f} сек...")
+                time.sleep(wait_time)
 
         raise RuntimeError(
             f"❌ Не удалось получить данные после {retries} попыток: {url}"
@@ -53,8 +267,62 @@ class HeadHunterAPI:
         url = f"{self.BASE_URL}/employers/{employer_id}"
         return self._get(url)
 
+    def get_vacancy_details(
+        self, vacancy_ids: list[str], max_workers: int = 8
+    ) -> dict[str, dict[str, Any]]:
+        """Параллельно загружает подробности вакансий из `/vacancies/{id}`.
+
+        Запросы выполняются пулом потоков, но проходят через общий
+        `rate_limiter`, поэтому суммарная частота обращений к API не растёт.
+
+        Args:
+            vacancy_ids: id вакансий.
+            max_workers: количество одновременных запросов.
+
+        Returns:
+            Словарь id -> {"description", "key_skills", "experience", "schedule"}.
+            Закрытые и удалённые вакансии в результат не попадают.
+        """
+
+        def fetch(vacancy_id: str) -> dict[str, Any]:
+            try:
+                return self._get(f"{self.BASE_URL}/vacancies/{vacancy_id}")
+            except CircuitOpenError:
+                raise
+            except RuntimeError as e:
+                print(e)
+                return {}
+
+        details: dict[str, dict[str, Any]] = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            try:
+                for vacancy_id, vac in zip(vacancy_ids, pool.map(fetch, vacancy_ids)):
+                    if not vac:
+                        continue
+                    details[vacancy_id] = {
+                        "description": vac.get("description"),
+                        "key_skills": [s["name"] for s in vac.get("key_skills") or []],
+                        "experience": (vac.get("experience") or {}).get("id"),
+                        "schedule": (vac.get("schedule") or {}).get("id"),
+                    }
+            except CircuitOpenError:
+                # API недоступен — оставшиеся запросы порции не отправляем
+                pool.shutdown(cancel_futures=True)
+                raise
+        return details
+
+    def _vacancy_params(
+        self, employer_id: str, facet: dict[str, Any] | None = None, **params: Any
+    ) -> dict[str, Any]:
+        """Собирает параметры `/vacancies` с учётом фильтров и среза выдачи."""
+        return {"employer_id": employer_id, **self.filters, **(facet or {}), **params}
+
     def get_vacancies(
-        self, employer_id: str, employer_name: str, found: int
+        self,
+        employer_id: str,
+        employer_name: str,
+        found: int,
+        facet: dict[str, Any] | None = None,
     ) -> list[dict[str, Any]]:
         url = f"{self.BASE_URL}/vacancies"
         vacancies = []
@@ -62,12 +330,13 @@ class HeadHunterAPI:
 
         # 1. Первая партия (до 2000, без интервалов)
         for page in range(20):
-            params = {
-                "employer_id": employer_id,
-                "per_page": 100,
-                "page": page,
-                "order_by": "publication_time",
-            }
+            params = self._vacancy_params(
+                employer_id,
+                facet,
+                per_page=100,
+                page=page,
+                order_by="publication_time",
+            )
             data = self._get(url, params)
             items = data.get("items", [])
             if not items:
@@ -96,14 +365,15 @@ class HeadHunterAPI:
             # если остаток меньше 2000 → берём max_days и собираем хвост
             if remaining <= 2000:
                 date_from = date_to - max_step
-                probe_params = {
-                    "employer_id": employer_id,
-                    "per_page": 1,
-                    "page": 0,
-                    "order_by": "publication_time",
-                    "date_from": date_from.isoformat(),
-                    "date_to": date_to.isoformat(),
-                }
+                probe_params = self._vacancy_params(
+                    employer_id,
+                    facet,
+                    per_page=1,
+                    page=0,
+                    order_by="publication_time",
+                    date_from=date_from.isoformat(),
+                    date_to=date_to.isoformat(),
+                )
                 probe_data = self._get(url, probe_params)
                 interval_found = probe_data.get("found", 0)
 
@@ -112,14 +382,15 @@ class HeadHunterAPI:
                     continue
 
                 for page in range(min(20, probe_data.get("pages", 0))):
-                    params = {
-                        "employer_id": employer_id,
-                        "per_page": 100,
-                        "page": page,
-                        "order_by": "publication_time",
-                        "date_from": date_from.isoformat(),
-                        "date_to": date_to.isoformat(),
-                    }
+                    params = self._vacancy_params(
+                        employer_id,
+                        facet,
+                        per_page=100,
+                        page=page,
+                        order_by="publication_time",
+                        date_from=date_from.isoformat(),
+                        date_to=date_to.isoformat(),
+                    )
                     data = self._get(url, params)
                     items = data.get("items", [])
                     if not items:
@@ -132,14 +403,15 @@ class HeadHunterAPI:
 
             # пробный запрос
             date_from = date_to - step
-            probe_params = {
-                "employer_id": employer_id,
-                "per_page": 1,
-                "page": 0,
-                "order_by": "publication_time",
-                "date_from": date_from.isoformat(),
-                "date_to": date_to.isoformat(),
-            }
+            probe_params = self._vacancy_params(
+                employer_id,
+                facet,
+                per_page=1,
+                page=0,
+                order_by="publication_time",
+                date_from=date_from.isoformat(),
+                date_to=date_to.isoformat(),
+            )
             probe_data = self._get(url, probe_params)
             interval_found = probe_data.get("found", 0)
 
@@ -153,14 +425,15 @@ class HeadHunterAPI:
 
             # если 1–2000 → сразу собираем
             for page in range(min(20, probe_data.get("pages", 0))):
-                params = {
-                    "employer_id": employer_id,
-                    "per_page": 100,
-                    "page": page,
-                    "order_by": "publication_time",
-                    "date_from": date_from.isoformat(),
-                    "date_to": date_to.isoformat(),
-                }
+                params = self._vacancy_params(
+                    employer_id,
+                    facet,
+                    per_page=100,
+                    page=page,
+                    order_by="publication_time",
+                    date_from=date_from.isoformat(),
+                    date_to=date_to.isoformat(),
+                )
                 data = self._get(url, params)
                 items = data.get("items", [])
                 if not items:
@@ -179,26 +452,102 @@ class HeadHunterAPI:
 
         return vacancies
 
+    def get_vacancies_by_facets(
+        self, employer_id: str, employer_name: str, found: int, facet: str
+    ) -> list[dict[str, Any]]:
+        """Собирает вакансии, разбивая выдачу по `area` или `professional_role`.
+
+        Количество вакансий в каждом срезе берётся из кластеров API одним
+        запросом. Срезы до 2000 вакансий забираются обычной пагинацией,
+        временные окна используются только внутри срезов, которые всё ещё
+        больше лимита. `found` у hh.ru приблизительный, поэтому небольшая
+        недостача допускается; обход всей выдачи по времени выполняется,
+        только если сами кластеры покрывают заметно меньше `found` (API
+        вернул не все значения среза).
+
+        Args:
+            employer_id: id работодателя.
+            employer_name: название работодателя (для логов).
+            found: общее число вакансий по запросу.
+            facet: параметр разбиения — "area" или "professional_role".
+        """
+        url = f"{self.BASE_URL}/vacancies"
+        probe_data = self._get(
+            url, self._vacancy_params(employer_id, per_page=1, clusters="true")
+        )
+        cluster = next(
+            (c for c in probe_data.get("clusters") or [] if c["id"] == facet), None
+        )
+        if not cluster:
+            print(f"⚠️ {employer_name}: нет кластера '{facet}', обходим по времени")
+            return self.get_vacancies(employer_id, employer_name, found)
+
+        covered = sum(item["count"] for item in cluster["items"])
+        vacancies: dict[str, dict[str, Any]] = {}
+        for item in cluster["items"]:
+            # значение среза берём из готовой ссылки кластера
+            values = parse_qs(urlparse(item["url"]).query).get(facet, [])
+            current = self.filters.get(facet) or []
+            new_values = [v for v in values if v not in current] or values[-1:]
+            if not new_values:
+                continue
+
+            part = self.get_vacancies(
+                employer_id,
+                f"{employer_name} / {item['name']}",
+                item["count"],
+                facet={facet: new_values[0]},
+            )
+            for vac in part:
+                vacancies[vac["id"]] = vac
+
+        tolerance = max(self.FACET_MIN_SHORTFALL, found * self.FACET_TOLERANCE)
+        if found - covered > tolerance:
+            print(
+                f"🔎 {employer_name}: кластеры '{facet}' покрывают {covered} / {found}, "
+                "обходим выдачу по времени"
+            )
+            for vac in self.get_vacancies(employer_id, employer_name, found):
+                vacancies.setdefault(vac["id"], vac)
+        elif len(vacancies) < found:
+            print(
+                f"🔎 {employer_name}: срезы '{facet}' дали {len(vacancies)} / {found} "
+                "(found у API приблизительный)"
+            )
+
+        return list(vacancies.values())
+
     def collect_data(self) -> dict[str, list[dict[str, Any]]]:
         """Загрузка работодателей и их вакансий."""
         data: dict[str, list[dict[str, Any]]] = {"employers": [], "vacancies": []}
 
-        for emp_id in self.employers:
-            employer = self.get_employer(emp_id)
-            if not employer:
-                print(f"❌ Работодатель {emp_id} не найден")
-                continue
+        for index, emp_id in enumerate(self.employers):
+            try:
+                employer = self.get_employer(emp_id)
+                if not employer:
+                    print(f"❌ Работодатель {emp_id} не найден")
+                    continue
 
-            emp_name = employer["name"]
-            declared_open = employer.get("open_vacancies", 0)
+                emp_name = employer["name"]
+                declared_open = employer.get("open_vacancies", 0)
 
-            # сначала делаем пробный запрос, чтобы узнать found
-            url = f"{self.BASE_URL}/vacancies"
-            probe_params = {"employer_id": emp_id, "per_page": 1}
-            probe_data = self._get(url, probe_params)
-            found = probe_data.get("found", 0)
+                # сначала делаем пробный запрос, чтобы узнать found
+                url = f"{self.BASE_URL}/vacancies"
+                probe_params = self._vacancy_params(emp_id, per_page=1)
+                probe_data = self._get(url, probe_params)
+                found = probe_data.get("found", 0)
 
-            vacancies = self.get_vacancies(emp_id, emp_name, found)
+                if self.partition == "time" or found <= 2000:
+                    vacancies = self.get_vacancies(emp_id, emp_name, found)
+                else:
+                    vacancies = self.get_vacancies_by_facets(
+                        emp_id, emp_name, found, self.partition
+                    )
+            except CircuitOpenError as e:
+                # API долго недоступен — не ждём заново ради каждого работодателя
+                skipped = len(self.employers) - index
+                print(f"{e}\n⏭ Сбор остановлен, пропущено работодателей: {skipped}")
+                break
 
             data["employers"].append(
                 {
@@ -206,6 +555,9 @@ class HeadHunterAPI:
                     "name": emp_name,
                     "url": employer["alternate_url"],
                     "open_vacancies": found,  # сохраняем именно то, что реально вернул API
+                    # полный список позволяет пометить отсутствующие вакансии закрытыми;
+                    # при фильтрах выдача заведомо неполная
+                    "complete": not self.filters and len(vacancies) >= found,
                 }
             )
 
@@ -0,0 +1,205 @@
+import itertools
+import re
+from decimal import Decimal
+from typing import Any
+
+import asyncpg
+
+from src.config import load_config
+from src.db_manager import (
+    ALL_VACANCIES_SQL,
+    AVG_SALARY_SQL,
+    BY_CURRENCY_SQL,
+    BY_EMPLOYER_SQL,
+    COMPANIES_SQL,
+    HIGHER_SALARY_SQL,
+    HISTOGRAM_SQL,
+    KEYWORD_SQL,
+    PERCENTILES_SQL,
+    vacancies_page_query,
+)
+
+# asyncpg использует нумерованные параметры вместо %s
+ASYNC_KEYWORD_SQL = KEYWORD_SQL.replace("%s", "$1")
+ASYNC_HISTOGRAM_SQL = (
+    HISTOGRAM_SQL.replace("%(low)s", "$1")
+    .replace("%(high)s", "$2")
+    .replace("%(buckets)s", "$3")
+)
+
+
+def _numbered(query: str) -> str:
+    """Заменяет позиционные %s на нумерованные параметры $1, $2, ..."""
+    counter = itertools.count(1)
+    return re.sub(r"%s", lambda _: f"${next(counter)}", query)
+
+
+class AsyncDBManager:
+    """Асинхронный аналог DBManager для сервисного использования.
+
+    Работает через пул соединений asyncpg. Каждый запрос готовится
+    (PREPARE) один раз на соединение и дальше берётся из кэша
+    подготовленных выражений этого соединения, поэтому горячие запросы
+    не разбираются сервером повторно. Методы совпадают с DBManager по
+    имени и возвращают такие же кортежи.
+
+    Пример:
+        async with AsyncDBManager() as db:
+            rows = await db.get_vacancies_with_keyword("Python")
+    """
+
+    def __init__(
+        self, min_size: int = 1, max_size: int = 10, database: str = "hh_db"
+    ) -> None:
+        """Сохраняет параметры пула; соединения открываются в `connect`.
+
+        Args:
+            min_size (int): минимальное количество соединений в пуле.
+            max_size (int): максимальное количество соединений в пуле.
+            database (str): имя базы данных.
+        """
+        self.database = database
+        self.min_size = min_size
+        self.max_size = max_size
+        self.pool: asyncpg.Pool | None = None
+
+    async def connect(self) -> "AsyncDBManager":
+        """Открывает пул соединений с базой данных."""
+        config = load_config()
+        self.pool = await asyncpg.create_pool(
+            database=self.database,
+            user=config["user"],
+            password=config["password"],
+            host=config["host"],
+            port=config["port"],
+            min_size=self.min_size,
+            max_size=self.max_size,
+            statement_cache_size=100,
+        )
+        return self
+
+    async def __aenter__(self) -> "AsyncDBManager":
+        """Поддержка `async with AsyncDBManager() as db:`."""
+        return await self.connect()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        """Закрывает пул при выходе из контекстного менеджера."""
+        await self.close()
+
+    async def _fetch(self, query: str, *args: Any) -> list[tuple[Any, ...]]:
+        """Выполняет запрос на соединении из пула и возвращает кортежи."""
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(query, *args)
+        return [tuple(row) for row in rows]
+
+    async def _fetchval(self, query: str, *args: Any) -> Any:
+        """Выполняет запрос и возвращает первое значение первой строки."""
+        async with self.pool.acquire() as conn:
+            return await conn.fetchval(query, *args)
+
+    async def get_companies_and_vacancies_count(
+        self,
+    ) -> list[tuple[str, int, float | None]]:
+        """Возвращает список компаний с количеством вакансий и средней зарплатой."""
+        return await self._fetch(COMPANIES_SQL)
+
+    async def get_all_vacancies(
+        self,
+    ) -> list[
+        tuple[str, str, float | None, float | None, str | None, float | None, str]
+    ]:
+        """Возвращает все вакансии с указанием компании и зарплаты."""
+        return await self._fetch(ALL_VACANCIES_SQL)
+
+    async def get_avg_salary(self) -> float | None:
+        """Вычисляет среднюю зарплату по всем вакансиям в рублях."""
+        return await self._fetchval(AVG_SALARY_SQL)
+
+    async def get_salary_percentiles(
+        self,
+    ) -> tuple[float | None, float | None, float | None]:
+        """Вычисляет 10-й, 50-й (медиану) и 90-й перцентили зарплаты в рублях."""
+        values = await self._fetchval(PERCENTILES_SQL)
+        if values is None:
+            return None, None, None
+        return values[0], values[1], values[2]
+
+    async def get_vacancies_with_higher_salary(
+        self,
+    ) -> list[
+        tuple[str, str, float | None, float | None, str | None, float | None, str]
+    ]:
+        """Возвращает вакансии, где зарплата (в рублях) выше средней."""
+        return await self._fetch(HIGHER_SALARY_SQL)
+
+    async def get_vacancies_with_keyword(
+        self, keyword: str
+    ) -> list[
+        tuple[str, str, float | None, float | None, str | None, float | None, str]
+    ]:
+        """Ищет вакансии по ключевому слову в названии.
+
+        Args:
+            keyword (str): слово для поиска.
+        """
+        return await self._fetch(ASYNC_KEYWORD_SQL, f"%{keyword}%")
+
+    async def get_vacancies_page(
+        self,
+        keyword: str | None = None,
+        higher_salary: bool = False,
+        after: tuple[str, str] | None = None,
+        limit: int = 100,
+    ) -> list[tuple[Any, ...]]:
+        """Возвращает страницу вакансий с keyset-пагинацией.
+
+        Args:
+            keyword (str | None): слово для поиска в названии.
+            higher_salary (bool): только вакансии с зарплатой выше средней.
+            after (tuple[str, str] | None): ключ последней строки предыдущей
+                страницы — (ключ сортировки, id вакансии).
+            limit (int): размер страницы.
+        """
+        if after:
+            # asyncpg не приводит строку к numeric, в отличие от psycopg2
+            after = (Decimal(after[0]), after[1])
+        query, params = vacancies_page_query(keyword, higher_salary, after, limit)
+        return await self._fetch(_numbered(query), *params)
+
+    async def get_salary_histogram(
+        self,
+        buckets: int = 10,
+        low: float | None = None,
+        high: float | None = None,
+    ) -> list[tuple[int, float, float, int]]:
+        """Строит гистограмму зарплат с корзинами одинаковой ширины.
+
+        Args:
+            buckets (int): количество корзин.
+            low (float | None): нижняя граница, по умолчанию минимальная зарплата.
+            high (float | None): верхняя граница, по умолчанию максимальная зарплата.
+        """
+        return await self._fetch(
+            ASYNC_HISTOGRAM_SQL,
+            None if low is None else Decimal(str(low)),
+            None if high is None else Decimal(str(high)),
+            buckets,
+        )
+
+    async def get_salary_stats_by_employer(
+        self,
+    ) -> list[tuple[str, int, float | None, float | None, float | None, float | None]]:
+        """Возвращает распределение зарплат в разрезе работодателей."""
+        return await self._fetch(BY_EMPLOYER_SQL)
+
+    async def get_salary_stats_by_currency(
+        self,
+    ) -> list[tuple[str, int, float | None, float | None]]:
+        """Возвращает количество вакансий и зарплаты в рублях по исходной валюте."""
+        return await self._fetch(BY_CURRENCY_SQL)
+
+    async def close(self) -> None:
+        """Закрывает пул соединений."""
+        if self.pool is not None:
+            await self.pool.close()
+            self.pool = None
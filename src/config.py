@@ -2,6 +2,9 @@ import os
 from typing import Any
 from dotenv import load_dotenv
 
+LOAD_MODES = ("reset", "reload", "merge")
+CRAWL_PARTITIONS = ("time", "area", "professional_role")
+
 
 def load_config() -> dict[str, Any]:
     """Загружает конфигурацию подключения к БД из .env файла.
@@ -18,3 +21,82 @@ def load_config() -> dict[str, Any]:
         "user": os.getenv("DB_USER", "postgres"),
         "password": os.getenv("DB_PASSWORD", ""),
     }
+
+
+def load_settings() -> dict[str, Any]:
+    """Загружает параметры загрузки данных из .env файла.
+
+    Returns:
+        dict[str, Any]: словарь с параметрами:
+            - load_mode: "reset" (очистить таблицы и загрузить заново),
+              "reload" (загрузить в staging и атомарно подменить таблицы) или
+              "merge" (записать только изменения и пометить закрытые вакансии);
+            - vacancy_partitions: количество HASH-секций vacancies
+              по employer_id (0 — без секционирования);
+            - enrich_details: загружать ли подробности вакансий;
+            - enrich_workers: количество параллельных запросов подробностей;
+            - crawl_partition: разбиение выдачи больше 2000 вакансий —
+              "time", "area" или "professional_role";
+            - snapshots: сохранять ли историю вакансий после каждой загрузки;
+            - snapshot_retention_months: сколько месяцев истории хранить.
+
+    Raises:
+        ValueError: если LOAD_MODE или HH_PARTITION не из списка допустимых
+            или SNAPSHOT_RETENTION_MONTHS меньше 1.
+    """
+    load_dotenv()
+
+    # опечатка в режиме молча переключила бы загрузку на дозапись без обновлений
+    load_mode = os.getenv("LOAD_MODE", "reset")
+    if load_mode not in LOAD_MODES:
+        raise ValueError(
+            f"Неизвестный LOAD_MODE '{load_mode}', доступны: {', '.join(LOAD_MODES)}"
+        )
+    crawl_partition = os.getenv("HH_PARTITION", "time")
+    if crawl_partition not in CRAWL_PARTITIONS:
+        raise ValueError(
+            f"Неизвестный HH_PARTITION '{crawl_partition}', "
+            f"доступны: {', '.join(CRAWL_PARTITIONS)}"
+        )
+    retention_months = int(os.getenv("SNAPSHOT_RETENTION_MONTHS", 12))
+    if retention_months < 1:
+        raise ValueError("SNAPSHOT_RETENTION_MONTHS должен быть не меньше 1")
+
+    return {
+        "load_mode": load_mode,
+        "vacancy_partitions": int(os.getenv("VACANCY_PARTITIONS", 0)),
+        "enrich_details": os.getenv("ENRICH_DETAILS", "").lower()
+        in ("1", "true", "yes"),
+        "enrich_workers": int(os.getenv("ENRICH_WORKERS", 8)),
+        "crawl_partition": crawl_partition,
+        "snapshots": os.getenv("SNAPSHOTS", "").lower() in ("1", "true", "yes"),
+        "snapshot_retention_months": retention_months,
+    }
+
+
+def load_search_filters() -> dict[str, Any]:
+    """Загружает фильтры поиска вакансий для запросов к API hh.ru из .env файла.
+
+    Фильтры передаются в `/vacancies` как есть, поэтому API возвращает
+    только подходящие вакансии. Пустые параметры не передаются.
+
+    Returns:
+        dict[str, Any]: параметры запроса (text, area, professional_role,
+            salary, only_with_salary, experience). Для area и
+            professional_role допускается несколько значений через запятую.
+    """
+    load_dotenv()
+
+    filters: dict[str, Any] = {
+        "text": os.getenv("HH_TEXT"),
+        "salary": os.getenv("HH_SALARY"),
+        "experience": os.getenv("HH_EXPERIENCE"),
+    }
+    multi_value = (("area", "HH_AREA"), ("professional_role", "HH_PROFESSIONAL_ROLE"))
+    for param, env in multi_value:
+        values = [v.strip() for v in os.getenv(env, "").split(",") if v.strip()]
+        filters[param] = values or None
+    if os.getenv("HH_ONLY_WITH_SALARY", "").lower() in ("1", "true", "yes"):
+        filters["only_with_salary"] = "true"
+
+    return {key: value for key, value in filters.items() if value}
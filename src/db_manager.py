@@ -1,21 +1,324 @@
+import csv
+import hashlib
+import io
+import json
+from datetime import date, timedelta
+from decimal import ROUND_HALF_UP, Decimal
 import psycopg2
+from psycopg2.extras import execute_values
 from typing import Any
 from src.config import load_config
 
+# Запросы, общие для методов выборки и экспорта
+COMPANIES_SQL = """
+    SELECT e.name,
+           COUNT(v.vacancy_id),
+           ROUND(AVG(v.salary_rub), 2)
+    FROM employers e
+    LEFT JOIN vacancies v
+        ON e.employer_id = v.employer_id AND v.archived_at IS NULL
+    GROUP BY e.name
+    ORDER BY AVG(v.salary_rub) DESC, COUNT(v.vacancy_id) DESC NULLS LAST
+"""
+
+ALL_VACANCIES_SQL = """
+    SELECT e.name, v.name, v.salary_from, v.salary_to,
+           v.salary_currency, v.salary_rub, v.url
+    FROM vacancies v
+    JOIN employers e ON v.employer_id = e.employer_id
+    WHERE v.archived_at IS NULL
+    ORDER BY v.salary_rub DESC NULLS LAST
+"""
+
+HIGHER_SALARY_SQL = """
+    SELECT v.name, e.name, v.salary_from, v.salary_to,
+           v.salary_currency, v.salary_rub, v.url
+    FROM vacancies v
+    JOIN employers e ON v.employer_id = e.employer_id
+    WHERE v.archived_at IS NULL
+      AND v.salary_rub > (
+          SELECT AVG(salary_rub) FROM vacancies
+          WHERE salary_rub IS NOT NULL AND archived_at IS NULL
+      )
+    ORDER BY v.salary_rub DESC
+"""
+
+AVG_SALARY_SQL = """
+    SELECT AVG(salary_rub) FROM vacancies
+    WHERE salary_rub IS NOT NULL AND archived_at IS NULL
+"""
+
+PERCENTILES_SQL = """
+    SELECT percentile_cont(ARRAY[0.1, 0.5, 0.9])
+           WITHIN GROUP (ORDER BY salary_rub)
+    FROM vacancies
+    WHERE salary_rub IS NOT NULL AND archived_at IS NULL
+"""
+
+HISTOGRAM_SQL = """
+    WITH bounds AS (
+        SELECT COALESCE(%(low)s, MIN(salary_rub))::numeric AS lo,
+               COALESCE(%(high)s, MAX(salary_rub))::numeric AS hi
+        FROM vacancies
+        WHERE salary_rub IS NOT NULL AND archived_at IS NULL
+    ),
+    counts AS (
+        SELECT LEAST(GREATEST(
+                   width_bucket(v.salary_rub, b.lo, b.hi, %(buckets)s), 1
+               ), %(buckets)s) AS bucket,
+               COUNT(*) AS cnt
+        FROM vacancies v, bounds b
+        WHERE v.salary_rub IS NOT NULL AND v.archived_at IS NULL
+          AND b.hi > b.lo
+        GROUP BY 1
+    )
+    SELECT g.bucket,
+           ROUND(b.lo + (b.hi - b.lo) * (g.bucket - 1) / %(buckets)s, 2),
+           ROUND(b.lo + (b.hi - b.lo) * g.bucket / %(buckets)s, 2),
+           COALESCE(c.cnt, 0)
+    FROM bounds b
+    CROSS JOIN generate_series(1, %(buckets)s) AS g(bucket)
+    LEFT JOIN counts c ON c.bucket = g.bucket
+    WHERE b.hi > b.lo
+    ORDER BY g.bucket
+"""
+
+BY_EMPLOYER_SQL = """
+    SELECT e.name,
+           COUNT(v.salary_rub),
+           percentile_cont(0.1) WITHIN GROUP (ORDER BY v.salary_rub),
+           percentile_cont(0.5) WITHIN GROUP (ORDER BY v.salary_rub),
+           percentile_cont(0.9) WITHIN GROUP (ORDER BY v.salary_rub),
+           ROUND(AVG(v.salary_rub), 2)
+    FROM employers e
+    LEFT JOIN vacancies v
+        ON e.employer_id = v.employer_id AND v.archived_at IS NULL
+    GROUP BY e.name
+    ORDER BY 4 DESC NULLS LAST, 2 DESC
+"""
+
+BY_CURRENCY_SQL = """
+    SELECT salary_currency,
+           COUNT(*),
+           percentile_cont(0.5) WITHIN GROUP (ORDER BY salary_rub),
+           ROUND(AVG(salary_rub), 2)
+    FROM vacancies
+    WHERE salary_currency IS NOT NULL AND archived_at IS NULL
+    GROUP BY salary_currency
+    ORDER BY 2 DESC
+"""
+
+SALARY_TREND_SQL = """
+    WITH weekly AS (
+        SELECT employer_id,
+               date_trunc('week', snapshot_date)::date AS week,
+               COUNT(DISTINCT vacancy_id) AS vacancies,
+               percentile_cont(0.5)
+                   WITHIN GROUP (ORDER BY salary_rub) AS median
+        FROM vacancy_snapshots
+        WHERE snapshot_date >= date_trunc('week', current_date)::date
+                               - %s * 7
+        GROUP BY employer_id, week
+    )
+    SELECT COALESCE(e.name, w.employer_id), w.week, w.vacancies, w.median
+    FROM weekly w
+    LEFT JOIN employers e ON e.employer_id = w.employer_id
+    ORDER BY 1, w.week
+"""
+
+COUNT_TREND_SQL = """
+    SELECT snapshot_date,
+           COUNT(*),
+           percentile_cont(0.5) WITHIN GROUP (ORDER BY salary_rub)
+    FROM vacancy_snapshots
+    WHERE snapshot_date > current_date - %s
+    GROUP BY snapshot_date
+    ORDER BY snapshot_date
+"""
+
+# Префикс месячных секций vacancy_snapshots: vacancy_snapshots_y2024m01
+SNAPSHOT_PARTITION_PREFIX = "vacancy_snapshots_y"
+
+# Канал NOTIFY, в который сообщается о завершении загрузки данных
+DATA_LOADED_CHANNEL = "hh_data_loaded"
+
+KEYWORD_SQL = """
+    SELECT v.name, e.name, v.salary_from, v.salary_to,
+           v.salary_currency, v.salary_rub, v.url
+    FROM vacancies v
+    JOIN employers e ON v.employer_id = e.employer_id
+    WHERE v.name ILIKE %s AND v.archived_at IS NULL
+    ORDER BY v.salary_rub DESC NULLS LAST
+"""
+
+_VACANCY_COLUMNS = [
+    ("company", "str"),
+    ("vacancy", "str"),
+    ("salary_from", "int"),
+    ("salary_to", "int"),
+    ("salary_currency", "str"),
+    ("salary_rub", "float"),
+    ("url", "str"),
+]
+
+# Наборы данных, доступные для экспорта: имя -> (SQL, колонки с типами)
+EXPORT_QUERIES: dict[str, tuple[str, list[tuple[str, str]]]] = {
+    "companies": (
+        COMPANIES_SQL,
+        [("company", "str"), ("vacancies_count", "int"), ("avg_salary_rub", "float")],
+    ),
+    "vacancies": (ALL_VACANCIES_SQL, _VACANCY_COLUMNS),
+    "higher_salary": (
+        HIGHER_SALARY_SQL,
+        [("vacancy", "str"), ("company", "str")] + _VACANCY_COLUMNS[2:],
+    ),
+    "keyword": (
+        KEYWORD_SQL,
+        [("vacancy", "str"), ("company", "str")] + _VACANCY_COLUMNS[2:],
+    ),
+}
+
+
+# Колонки в порядке значений `DBManager._vacancy_row` и строк работодателей
+EMPLOYER_COLUMNS = ["employer_id", "name", "url", "open_vacancies"]
+VACANCY_COLUMNS = [
+    "vacancy_id",
+    "employer_id",
+    "name",
+    "salary_from",
+    "salary_to",
+    "salary_currency",
+    "salary_rub",
+    "url",
+    "content_hash",
+]
+
+
+def _copy_value(value: Any) -> str:
+    """Кодирует значение для текстового формата COPY."""
+    if value is None:
+        return "\\N"
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def vacancy_hash(vac: dict[str, Any]) -> str:
+    """Вычисляет хеш содержимого вакансии для обнаружения изменений.
+
+    Args:
+        vac (dict[str, Any]): вакансия в формате `HeadHunterAPI.collect_data`.
+
+    Returns:
+        str: md5 в шестнадцатеричном виде.
+    """
+    payload = [
+        vac["employer_id"],
+        vac["name"],
+        vac["salary_from"],
+        vac["salary_to"],
+        vac["salary_currency"],
+        vac["url"],
+    ]
+    return hashlib.md5(
+        json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    ).hexdigest()
+
+
+def _salary_rub(vac: dict[str, Any], rates: dict[str, float]) -> float | None:
+    """Считает среднюю зарплату вакансии в рублях по курсу валюты."""
+    salary_from = vac["salary_from"]
+    salary_to = vac["salary_to"]
+    if not (salary_from or salary_to):
+        return None
+    rate = rates.get(vac["salary_currency"], 1.0)
+    return ((salary_from or salary_to) + (salary_to or salary_from)) / 2 / rate
+
+
+def vacancies_page_query(
+    keyword: str | None, higher_salary: bool, after: tuple[str, str] | None, limit: int
+) -> tuple[str, list[Any]]:
+    """Собирает запрос страницы вакансий для `get_vacancies_page`.
+
+    Returns:
+        tuple[str, list[Any]]: SQL с параметрами %s и значения параметров.
+    """
+    conditions = ["v.archived_at IS NULL"]
+    params: list[Any] = []
+    if keyword:
+        conditions.append("v.name ILIKE %s")
+        params.append(f"%{keyword}%")
+    if higher_salary:
+        conditions.append(f"v.salary_rub > ({AVG_SALARY_SQL})")
+    if after:
+        conditions.append(
+            "(COALESCE(v.salary_rub, -1), v.vacancy_id) < (%s::numeric, %s)"
+        )
+        params.extend(after)
+    params.append(limit)
+    query = f"""
+        SELECT v.vacancy_id, v.name, e.name, v.salary_from, v.salary_to,
+               v.salary_currency, v.salary_rub, v.url,
+               COALESCE(v.salary_rub, -1)
+        FROM vacancies v
+        JOIN employers e ON v.employer_id = e.employer_id
+        WHERE {" AND ".join(conditions)}
+        ORDER BY COALESCE(v.salary_rub, -1) DESC, v.vacancy_id DESC
+        LIMIT %s
+    """
+    return query, params
+
+
+def with_limit(
+    sql: str, params: tuple[Any, ...], limit: int | None
+) -> tuple[str, tuple[Any, ...] | None]:
+    """Добавляет к запросу с позиционными параметрами %s ограничение LIMIT.
+
+    Args:
+        sql (str): запрос без собственного LIMIT.
+        params (tuple[Any, ...]): параметры запроса.
+        limit (int | None): максимальное количество строк, None — без ограничения.
+
+    Returns:
+        tuple[str, tuple[Any, ...] | None]: запрос и параметры для `cur.execute`.
+    """
+    if limit:
+        return f"{sql.rstrip()}\n    LIMIT %s", (*params, limit)
+    return sql, params or None
+
+
+def _numeric_2(value: float | None) -> Decimal | None:
+    """Округляет значение так же, как PostgreSQL при записи в NUMERIC(14,2)."""
+    if value is None:
+        return None
+    return Decimal(repr(value)).quantize(Decimal("0.01"), ROUND_HALF_UP)
+
 
 class DBManager:
     """Класс для управления базой данных вакансий и работодателей."""
 
-    def __init__(self) -> None:
-        """Инициализация подключения к базе данных."""
-        config = load_config()
-        self.conn = psycopg2.connect(
-            dbname="hh_db",
-            user=config["user"],
-            password=config["password"],
-            host=config["host"],
-            port=config["port"],
-        )
+    def __init__(self, conn: Any = None) -> None:
+        """Инициализация подключения к базе данных.
+
+        Args:
+            conn: готовое подключение psycopg2 (например, из пула). Такое
+                подключение не закрывается в `close`, им управляет владелец.
+        """
+        self._owns_conn = conn is None
+        if conn is None:
+            config = load_config()
+            conn = psycopg2.connect(
+                dbname="hh_db",
+                user=config["user"],
+                password=config["password"],
+                host=config["host"],
+                port=config["port"],
+            )
+        self.conn = conn
         self.conn.autocommit = True
 
     def __enter__(self) -> "DBManager":
@@ -26,92 +329,312 @@ class DBManager:
         """Закрывает соединение при выходе из контекстного менеджера."""
         self.close()
 
-    def insert_data(self, data: dict[str, list[dict[str, Any]]]) -> None:
-        """Загружает данные о работодателях и вакансиях в БД.
+    def insert_data(
+        self, data: dict[str, list[dict[str, Any]]], staging: bool = False
+    ) -> None:
+        """Загружает данные о работодателях и вакансиях в БД одной транзакцией.
+
+        Staging-таблицы создаются пустыми перед каждой перезаливкой, поэтому
+        они заполняются через `COPY ... FROM STDIN` (повторы ключей
+        отбрасываются заранее). Рабочие таблицы заполняются пакетными
+        INSERT с пропуском уже существующих строк.
 
         Args:
             data (dict[str, list[dict[str, Any]]]): словарь с данными,
                 где ключи: "employers" и "vacancies".
+            staging (bool): писать в employers_staging/vacancies_staging
+                вместо рабочих таблиц.
         """
+        employers_table = "employers_staging" if staging else "employers"
+        vacancies_table = "vacancies_staging" if staging else "vacancies"
+        employer_rows = [
+            (emp["employer_id"], emp["name"], emp["url"], emp["open_vacancies"])
+            for emp in data["employers"]
+        ]
+
         with self.conn.cursor() as cur:
-            # --- работодатели ---
-            for emp in data["employers"]:
-                cur.execute(
+            cur.execute("BEGIN")
+            try:
+                rates = self._get_currency_rates(cur)
+                vacancy_rows = [
+                    self._vacancy_row(vac, rates) for vac in data["vacancies"]
+                ]
+                if staging:
+                    self._copy_rows(
+                        cur, employers_table, EMPLOYER_COLUMNS, employer_rows
+                    )
+                    self._copy_rows(
+                        cur, vacancies_table, VACANCY_COLUMNS, vacancy_rows
+                    )
+                else:
+                    execute_values(
+                        cur,
+                        f"""
+                        INSERT INTO {employers_table} ({", ".join(EMPLOYER_COLUMNS)})
+                        VALUES %s
+                        ON CONFLICT (employer_id) DO NOTHING
+                        """,
+                        employer_rows,
+                        page_size=1000,
+                    )
+                    execute_values(
+                        cur,
+                        f"""
+                        INSERT INTO {vacancies_table} ({", ".join(VACANCY_COLUMNS)})
+                        VALUES %s
+                        ON CONFLICT DO NOTHING
+                        """,
+                        vacancy_rows,
+                        page_size=1000,
+                    )
+                cur.execute("COMMIT")
+            except Exception:
+                cur.execute("ROLLBACK")
+                raise
+
+    @staticmethod
+    def _copy_rows(
+        cur: Any, table: str, columns: list[str], rows: list[tuple[Any, ...]]
+    ) -> None:
+        """Загружает строки в пустую таблицу через `COPY ... FROM STDIN`.
+
+        Повторы первичного ключа (первая колонка) отбрасываются: COPY не
+        поддерживает ON CONFLICT, а в выдаче API одна вакансия может
+        встретиться дважды.
+        """
+        buffer = io.StringIO()
+        seen = set()
+        for row in rows:
+            if row[0] in seen:
+                continue
+            seen.add(row[0])
+            buffer.write("\t".join(_copy_value(value) for value in row) + "\n")
+        buffer.seek(0)
+        cur.copy_expert(
+            f"COPY {table} ({', '.join(columns)}) FROM STDIN",
+            buffer,
+            size=1 << 20,
+        )
+
+    @staticmethod
+    def _get_currency_rates(cur: Any) -> dict[str, float]:
+        """Читает курсы валют одним запросом."""
+        cur.execute("SELECT code, rate FROM currency_rates")
+        return {code: float(rate) for code, rate in cur.fetchall()}
+
+    @staticmethod
+    def _vacancy_row(vac: dict[str, Any], rates: dict[str, float]) -> tuple:
+        """Готовит кортеж значений для вставки вакансии."""
+        return (
+            vac["vacancy_id"],
+            vac["employer_id"],
+            vac["name"],
+            vac["salary_from"],
+            vac["salary_to"],
+            vac["salary_currency"],
+            _salary_rub(vac, rates),
+            vac["url"],
+            vacancy_hash(vac),
+        )
+
+    def merge_data(self, data: dict[str, list[dict[str, Any]]]) -> dict[str, int]:
+        """Применяет к БД только изменения по сравнению с прошлой загрузкой.
+
+        Для каждой вакансии сравнивается хеш содержимого и зарплата в рублях
+        по текущему курсу: новые и изменённые вакансии (в том числе после
+        смены курса валюты) записываются, неизменённые пропускаются без
+        единой записи.
+        Вакансии работодателей, собранных полностью (флаг "complete"),
+        которых нет в новых данных, помечаются как архивные. Все изменения
+        применяются одной транзакцией.
+
+        Args:
+            data (dict[str, list[dict[str, Any]]]): словарь с данными,
+                где ключи: "employers" и "vacancies".
+
+        Returns:
+            dict[str, int]: количество записанных ("written"),
+                пропущенных ("unchanged") и архивированных ("archived") вакансий.
+        """
+        stats = {"written": 0, "unchanged": 0, "archived": 0}
+        # в выдаче API одна вакансия может встретиться дважды, а ON CONFLICT
+        # DO UPDATE не обновляет строку дважды за команду — оставляем последнюю
+        employers = {emp["employer_id"]: emp for emp in data["employers"]}
+        vacancies = {vac["vacancy_id"]: vac for vac in data["vacancies"]}
+        employer_ids = list(employers)
+
+        with self.conn.cursor() as cur:
+            cur.execute("BEGIN")
+            try:
+                # --- работодатели: обновляем только изменившиеся ---
+                execute_values(
+                    cur,
                     """
                     INSERT INTO employers (employer_id, name, url, open_vacancies)
-                    VALUES (%s, %s, %s, %s)
-                    ON CONFLICT (employer_id) DO NOTHING
+                    VALUES %s
+                    ON CONFLICT (employer_id) DO UPDATE
+                    SET name = EXCLUDED.name,
+                        url = EXCLUDED.url,
+                        open_vacancies = EXCLUDED.open_vacancies
+                    WHERE (employers.name, employers.url, employers.open_vacancies)
+                          IS DISTINCT FROM
+                          (EXCLUDED.name, EXCLUDED.url, EXCLUDED.open_vacancies)
                     """,
-                    (
-                        emp["employer_id"],
-                        emp["name"],
-                        emp["url"],
-                        emp["open_vacancies"],
-                    ),
+                    [
+                        (
+                            emp["employer_id"],
+                            emp["name"],
+                            emp["url"],
+                            emp["open_vacancies"],
+                        )
+                        for emp in employers.values()
+                    ],
                 )
 
-            # --- вакансии ---
-            for vac in data["vacancies"]:
-                salary_from = vac["salary_from"]
-                salary_to = vac["salary_to"]
-                currency = vac["salary_currency"]
-
-                # берём курс для валюты
+                # --- вакансии: сравниваем хеши с сохранёнными ---
                 cur.execute(
-                    "SELECT rate FROM currency_rates WHERE code = %s", (currency,)
+                    """
+                    SELECT vacancy_id, content_hash, archived_at IS NOT NULL, salary_rub
+                    FROM vacancies
+                    WHERE employer_id = ANY(%s)
+                    """,
+                    (employer_ids,),
                 )
-                rate_row = cur.fetchone()
-                rate = float(rate_row[0]) if rate_row else 1.0
-
-                # считаем зарплату в рублях
-                if salary_from or salary_to:
-                    salary_rub = (
-                        ((salary_from or salary_to) + (salary_to or salary_from))
-                        / 2
-                        / rate
-                    )
-                else:
-                    salary_rub = None
-                cur.execute(
+                stored = {vac_id: state for vac_id, *state in cur.fetchall()}
+
+                # salary_rub зависит от курса валют, а не от содержимого вакансии,
+                # поэтому сравнивается отдельно от хеша
+                rates = self._get_currency_rates(cur)
+                changed = []
+                for vac in vacancies.values():
+                    row = self._vacancy_row(vac, rates)
+                    expected = [row[-1], False, _numeric_2(row[6])]
+                    if stored.get(vac["vacancy_id"]) == expected:
+                        stats["unchanged"] += 1
+                    else:
+                        changed.append(row)
+
+                # ON CONSTRAINT подходит и для обычного, и для секционированного PK
+                execute_values(
+                    cur,
                     """
                     INSERT INTO vacancies (
-                        vacancy_id, employer_id, name,
-                        salary_from, salary_to, salary_currency, salary_rub, url
+                        vacancy_id, employer_id, name, salary_from, salary_to,
+                        salary_currency, salary_rub, url, content_hash
                     )
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                    ON CONFLICT (vacancy_id) DO NOTHING
+                    VALUES %s
+                    ON CONFLICT ON CONSTRAINT vacancies_pkey DO UPDATE
+                    SET name = EXCLUDED.name,
+                        salary_from = EXCLUDED.salary_from,
+                        salary_to = EXCLUDED.salary_to,
+                        salary_currency = EXCLUDED.salary_currency,
+                        salary_rub = EXCLUDED.salary_rub,
+                        url = EXCLUDED.url,
+                        content_hash = EXCLUDED.content_hash,
+                        archived_at = NULL
                     """,
-                    (
-                        vac["vacancy_id"],
-                        vac["employer_id"],
-                        vac["name"],
-                        salary_from,
-                        salary_to,
-                        currency,
-                        salary_rub,
-                        vac["url"],
-                    ),
+                    changed,
+                    page_size=1000,
                 )
+                stats["written"] = len(changed)
 
-    def get_companies_and_vacancies_count(self) -> list[tuple[str, int, float | None]]:
-        """Возвращает список компаний с количеством вакансий и средней зарплатой.
+                # --- закрытые вакансии: только у полностью собранных работодателей ---
+                seen: dict[str, list[str]] = {}
+                for vac in vacancies.values():
+                    seen.setdefault(vac["employer_id"], []).append(vac["vacancy_id"])
+                for emp in employers.values():
+                    if not emp.get("complete"):
+                        continue
+                    cur.execute(
+                        """
+                        UPDATE vacancies
+                        SET archived_at = now()
+                        WHERE employer_id = %s
+                          AND archived_at IS NULL
+                          AND NOT (vacancy_id = ANY(%s))
+                        """,
+                        (emp["employer_id"], seen.get(emp["employer_id"], [])),
+                    )
+                    stats["archived"] += cur.rowcount
+                cur.execute("COMMIT")
+            except Exception:
+                cur.execute("ROLLBACK")
+                raise
+
+        return stats
+
+    def get_vacancies_without_details(self) -> list[tuple[str, str]]:
+        """Возвращает вакансии, для которых нет актуальных подробностей.
+
+        Подробности считаются актуальными, если они были загружены для того же
+        `content_hash`, что сейчас хранится у вакансии.
 
         Returns:
-            list[tuple[str, int, float | None]]: список кортежей вида
-                (название компании, количество вакансий, средняя зарплата в рублях).
+            list[tuple[str, str]]: список кортежей (id вакансии, content_hash).
         """
         with self.conn.cursor() as cur:
             cur.execute(
                 """
-                SELECT e.name,
-                       COUNT(v.vacancy_id),
-                       ROUND(AVG(v.salary_rub), 2)
-                FROM employers e
-                LEFT JOIN vacancies v ON e.employer_id = v.employer_id
-                GROUP BY e.name
-                ORDER BY AVG(v.salary_rub) DESC, COUNT(v.vacancy_id) DESC NULLS LAST
+                SELECT v.vacancy_id, v.content_hash
+                FROM vacancies v
+                LEFT JOIN vacancy_details d ON d.vacancy_id = v.vacancy_id
+                WHERE v.archived_at IS NULL
+                  AND d.content_hash IS DISTINCT FROM v.content_hash
+                """
+            )
+            return cur.fetchall()
+
+    def save_vacancy_details(
+        self, details: dict[str, dict[str, Any]], hashes: dict[str, str]
+    ) -> None:
+        """Сохраняет подробности вакансий в таблицу vacancy_details.
+
+        Args:
+            details (dict[str, dict[str, Any]]): результат
+                `HeadHunterAPI.get_vacancy_details`.
+            hashes (dict[str, str]): content_hash вакансий, для которых
+                загружены подробности.
+        """
+        with self.conn.cursor() as cur:
+            execute_values(
+                cur,
                 """
+                INSERT INTO vacancy_details (
+                    vacancy_id, description, key_skills, experience,
+                    schedule, content_hash
+                )
+                VALUES %s
+                ON CONFLICT (vacancy_id) DO UPDATE
+                SET description = EXCLUDED.description,
+                    key_skills = EXCLUDED.key_skills,
+                    experience = EXCLUDED.experience,
+                    schedule = EXCLUDED.schedule,
+                    content_hash = EXCLUDED.content_hash,
+                    fetched_at = now()
+                """,
+                [
+                    (
+                        vacancy_id,
+                        d["description"],
+                        d["key_skills"],
+                        d["experience"],
+                        d["schedule"],
+                        hashes[vacancy_id],
+                    )
+                    for vacancy_id, d in details.items()
+                ],
+                page_size=500,
             )
+
+    def get_companies_and_vacancies_count(self) -> list[tuple[str, int, float | None]]:
+        """Возвращает список компаний с количеством вакансий и средней зарплатой.
+
+        Returns:
+            list[tuple[str, int, float | None]]: список кортежей вида
+                (название компании, количество вакансий, средняя зарплата в рублях).
+        """
+        with self.conn.cursor() as cur:
+            cur.execute(COMPANIES_SQL)
             return cur.fetchall()
 
     def get_all_vacancies(
@@ -127,15 +650,7 @@ class DBManager:
                 (название компании, вакансия, зарплата от, зарплата до, валюта, средняя зарплата, ссылка).
         """
         with self.conn.cursor() as cur:
-            cur.execute(
-                """
-                SELECT e.name, v.name, v.salary_from, v.salary_to,
-                       v.salary_currency, v.salary_rub, v.url
-                FROM vacancies v
-                JOIN employers e ON v.employer_id = e.employer_id
-                ORDER BY v.salary_rub DESC NULLS LAST
-                """
-            )
+            cur.execute(ALL_VACANCIES_SQL)
             return cur.fetchall()
 
     def get_avg_salary(self) -> float | None:
@@ -145,9 +660,7 @@ class DBManager:
             float | None: среднее значение зарплаты (в рублях) или None.
         """
         with self.conn.cursor() as cur:
-            cur.execute(
-                "SELECT AVG(salary_rub) FROM vacancies WHERE salary_rub IS NOT NULL"
-            )
+            cur.execute(AVG_SALARY_SQL)
             return cur.fetchone()[0]
 
     def get_vacancies_with_higher_salary(
@@ -163,16 +676,36 @@ class DBManager:
                 (название компании, вакансия, зарплата от, зарплата до, валюта, средняя зарплата, ссылка).
         """
         with self.conn.cursor() as cur:
-            cur.execute(
-                """
-                SELECT v.name, e.name, v.salary_from, v.salary_to,
-                       v.salary_currency, v.salary_rub, v.url
-                FROM vacancies v
-                JOIN employers e ON v.employer_id = e.employer_id
-                WHERE v.salary_rub > (SELECT AVG(salary_rub) FROM vacancies WHERE salary_rub IS NOT NULL)
-                ORDER BY v.salary_rub DESC
-                """
-            )
+            cur.execute(HIGHER_SALARY_SQL)
+            return cur.fetchall()
+
+    def get_vacancies_page(
+        self,
+        keyword: str | None = None,
+        higher_salary: bool = False,
+        after: tuple[str, str] | None = None,
+        limit: int = 100,
+    ) -> list[tuple[Any, ...]]:
+        """Возвращает страницу вакансий с keyset-пагинацией.
+
+        Вакансии упорядочены по зарплате в рублях (без зарплаты — в конце) и
+        id. Следующая страница запрашивается по ключу последней строки, поэтому
+        стоимость запроса не растёт с номером страницы.
+
+        Args:
+            keyword (str | None): слово для поиска в названии.
+            higher_salary (bool): только вакансии с зарплатой выше средней.
+            after (tuple[str, str] | None): ключ последней строки предыдущей
+                страницы — (ключ сортировки, id вакансии).
+            limit (int): размер страницы.
+
+        Returns:
+            list[tuple[Any, ...]]: список кортежей
+                (id вакансии, вакансия, компания, зарплата от, зарплата до,
+                валюта, средняя зарплата, ссылка, ключ сортировки).
+        """
+        with self.conn.cursor() as cur:
+            cur.execute(*vacancies_page_query(keyword, higher_salary, after, limit))
             return cur.fetchall()
 
     def get_vacancies_with_keyword(
@@ -190,20 +723,326 @@ class DBManager:
                 Список кортежей:
                 (название компании, вакансия, зарплата от, зарплата до, валюта, средняя зарплата, ссылка).
         """
+        with self.conn.cursor() as cur:
+            cur.execute(KEYWORD_SQL, (f"%{keyword}%",))
+            return cur.fetchall()
+
+    def get_salary_percentiles(self) -> tuple[float | None, float | None, float | None]:
+        """Вычисляет 10-й, 50-й (медиану) и 90-й перцентили зарплаты в рублях.
+
+        В отличие от среднего, медиана устойчива к единичным очень высоким
+        зарплатам. Расчёт выполняется целиком на стороне PostgreSQL.
+
+        Returns:
+            tuple[float | None, float | None, float | None]:
+                (p10, медиана, p90) или None, если зарплат нет.
+        """
+        with self.conn.cursor() as cur:
+            cur.execute(PERCENTILES_SQL)
+            values = cur.fetchone()[0]
+            if values is None:
+                return None, None, None
+            return values[0], values[1], values[2]
+
+    def get_salary_histogram(
+        self,
+        buckets: int = 10,
+        low: float | None = None,
+        high: float | None = None,
+    ) -> list[tuple[int, float, float, int]]:
+        """Строит гистограмму зарплат с корзинами одинаковой ширины.
+
+        Args:
+            buckets (int): количество корзин.
+            low (float | None): нижняя граница, по умолчанию минимальная зарплата.
+            high (float | None): верхняя граница, по умолчанию максимальная зарплата.
+                Значения вне [low, high] попадают в крайние корзины.
+
+        Returns:
+            list[tuple[int, float, float, int]]: список кортежей
+                (номер корзины, нижняя граница, верхняя граница, количество вакансий).
+        """
+        with self.conn.cursor() as cur:
+            cur.execute(
+                HISTOGRAM_SQL,
+                {"low": low, "high": high, "buckets": buckets},
+            )
+            return cur.fetchall()
+
+    def get_salary_stats_by_employer(
+        self,
+    ) -> list[tuple[str, int, float | None, float | None, float | None, float | None]]:
+        """Возвращает распределение зарплат в разрезе работодателей.
+
+        Returns:
+            list[tuple[str, int, float | None, float | None, float | None, float | None]]:
+                Список кортежей:
+                (компания, вакансий с зарплатой, p10, медиана, p90, средняя зарплата).
+        """
+        with self.conn.cursor() as cur:
+            cur.execute(BY_EMPLOYER_SQL)
+            return cur.fetchall()
+
+    def take_snapshot(self, snapshot_date: date | None = None) -> int:
+        """Дописывает текущее состояние вакансий в историю vacancy_snapshots.
+
+        Секция нужного месяца создаётся при первой записи. Повторный снимок
+        за ту же дату заменяет предыдущий, всё выполняется одной транзакцией.
+
+        Args:
+            snapshot_date (date | None): дата снимка, по умолчанию сегодня.
+
+        Returns:
+            int: количество записанных строк.
+        """
+        day = snapshot_date or date.today()
+        month = day.replace(day=1)
+        next_month = (month.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+        with self.conn.cursor() as cur:
+            cur.execute("BEGIN")
+            try:
+                cur.execute(
+                    f"""
+                    CREATE TABLE IF NOT EXISTS {SNAPSHOT_PARTITION_PREFIX}{month:%Ym%m}
+                    PARTITION OF vacancy_snapshots
+                    FOR VALUES FROM (%s) TO (%s)
+                    """,
+                    (month, next_month),
+                )
+                cur.execute(
+                    "DELETE FROM vacancy_snapshots WHERE snapshot_date = %s", (day,)
+                )
+                cur.execute(
+                    """
+                    INSERT INTO vacancy_snapshots (
+                        snapshot_date, vacancy_id, employer_id,
+                        salary_rub, salary_currency
+                    )
+                    SELECT %s, vacancy_id, employer_id, salary_rub, salary_currency
+                    FROM vacancies
+                    WHERE archived_at IS NULL
+                    """,
+                    (day,),
+                )
+                written = cur.rowcount
+                cur.execute("COMMIT")
+            except Exception:
+                cur.execute("ROLLBACK")
+                raise
+        return written
+
+    def drop_old_snapshots(self, keep_months: int) -> list[str]:
+        """Удаляет секции истории старше `keep_months` месяцев.
+
+        Секции удаляются целиком через DROP TABLE, без построчного DELETE и
+        последующего VACUUM.
+
+        Args:
+            keep_months (int): сколько последних месяцев хранить, включая текущий.
+
+        Returns:
+            list[str]: имена удалённых секций.
+
+        Raises:
+            ValueError: если `keep_months` меньше 1 — иначе удалились бы все
+                секции, включая текущий месяц.
+        """
+        if keep_months < 1:
+            raise ValueError("Нужно хранить хотя бы один месяц истории")
+        today = date.today()
+        months = today.year * 12 + today.month - 1 - (keep_months - 1)
+        cutoff = f"{SNAPSHOT_PARTITION_PREFIX}{months // 12:04d}m{months % 12 + 1:02d}"
+
         with self.conn.cursor() as cur:
             cur.execute(
                 """
-                SELECT v.name, e.name, v.salary_from, v.salary_to,
-                       v.salary_currency, v.salary_rub, v.url
-                FROM vacancies v
-                JOIN employers e ON v.employer_id = e.employer_id
-                WHERE v.name ILIKE %s
-                ORDER BY v.salary_rub DESC NULLS LAST
-                """,
-                (f"%{keyword}%",),
+                SELECT c.relname
+                FROM pg_inherits i
+                JOIN pg_class c ON c.oid = i.inhrelid
+                WHERE i.inhparent = 'vacancy_snapshots'::regclass
+                ORDER BY c.relname
+                """
             )
+            # имена секций вида vacancy_snapshots_y2024m01 сравниваются как даты
+            dropped = [
+                name
+                for (name,) in cur.fetchall()
+                if name.startswith(SNAPSHOT_PARTITION_PREFIX) and name < cutoff
+            ]
+            for name in dropped:
+                cur.execute(f"DROP TABLE {name}")
+        return dropped
+
+    def get_salary_trend_by_employer(
+        self, weeks: int = 12, limit: int | None = None
+    ) -> list[tuple[str, date, int, float | None]]:
+        """Возвращает медианную зарплату и число вакансий по компаниям и неделям.
+
+        Фильтр по дате отсекает лишние секции и блоки BRIN-индекса, поэтому
+        запрос читает только последние `weeks` недель истории. Названия
+        компаний подставляются уже к агрегированным строкам.
+
+        Args:
+            weeks (int): глубина истории в неделях.
+            limit (int | None): максимальное количество строк.
+
+        Returns:
+            list[tuple[str, date, int, float | None]]: список кортежей
+                (компания, начало недели, вакансий, медианная зарплата в рублях).
+        """
+        with self.conn.cursor() as cur:
+            cur.execute(*with_limit(SALARY_TREND_SQL, (weeks - 1,), limit))
+            return cur.fetchall()
+
+    def get_vacancy_count_trend(
+        self, days: int = 90, limit: int | None = None
+    ) -> list[tuple[date, int, float | None]]:
+        """Возвращает количество вакансий и медианную зарплату по дням снимков.
+
+        Args:
+            days (int): глубина истории в днях.
+            limit (int | None): максимальное количество строк.
+
+        Returns:
+            list[tuple[date, int, float | None]]: список кортежей
+                (дата снимка, вакансий, медианная зарплата в рублях).
+        """
+        with self.conn.cursor() as cur:
+            cur.execute(*with_limit(COUNT_TREND_SQL, (days,), limit))
+            return cur.fetchall()
+
+    def get_salary_stats_by_currency(
+        self,
+    ) -> list[tuple[str, int, float | None, float | None]]:
+        """Возвращает количество вакансий и зарплаты в рублях по исходной валюте.
+
+        Returns:
+            list[tuple[str, int, float | None, float | None]]: список кортежей
+                (валюта, количество вакансий, медиана в рублях, средняя в рублях).
+        """
+        with self.conn.cursor() as cur:
+            cur.execute(BY_CURRENCY_SQL)
             return cur.fetchall()
 
+    def _export_sql(self, cur: Any, dataset: str, keyword: str | None) -> str:
+        """Возвращает SQL набора данных с подставленными параметрами."""
+        if dataset not in EXPORT_QUERIES:
+            raise ValueError(
+                f"Неизвестный набор данных '{dataset}', "
+                f"доступны: {', '.join(EXPORT_QUERIES)}"
+            )
+        sql = EXPORT_QUERIES[dataset][0]
+        if dataset == "keyword":
+            if not keyword:
+                raise ValueError("Для набора 'keyword' нужно указать ключевое слово")
+            # COPY не принимает параметры, поэтому подставляем их на клиенте
+            sql = cur.mogrify(sql, (f"%{keyword}%",)).decode()
+        return sql
+
+    def export_to_csv(
+        self, dataset: str, path: str, keyword: str | None = None
+    ) -> None:
+        """Потоково выгружает набор данных в CSV через `COPY ... TO STDOUT`.
+
+        Данные пишутся в файл по мере поступления от сервера, поэтому
+        потребление памяти не зависит от количества строк.
+
+        Args:
+            dataset (str): имя набора данных из `EXPORT_QUERIES`.
+            path (str): путь к CSV-файлу.
+            keyword (str | None): ключевое слово для набора "keyword".
+        """
+        with self.conn.cursor() as cur:
+            sql = self._export_sql(cur, dataset, keyword)
+            with open(path, "w", encoding="utf-8", newline="") as f:
+                # заголовок пишем сами: имена колонок у SELECT повторяются (name, name)
+                csv.writer(f).writerow(
+                    [name for name, _ in EXPORT_QUERIES[dataset][1]]
+                )
+                cur.copy_expert(
+                    f"COPY ({sql}) TO STDOUT WITH (FORMAT csv)", f, size=1 << 20
+                )
+
+    def export_to_parquet(
+        self,
+        dataset: str,
+        path: str,
+        keyword: str | None = None,
+        chunk_size: int = 50_000,
+    ) -> int:
+        """Потоково выгружает набор данных в Parquet через серверный курсор.
+
+        Строки читаются порциями по `chunk_size` и записываются отдельными
+        row group, так что в памяти держится не больше одной порции.
+        Требует установленного пакета `pyarrow`.
+
+        Args:
+            dataset (str): имя набора данных из `EXPORT_QUERIES`.
+            path (str): путь к Parquet-файлу.
+            keyword (str | None): ключевое слово для набора "keyword".
+            chunk_size (int): количество строк в одной порции.
+
+        Returns:
+            int: количество выгруженных строк.
+        """
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise RuntimeError(
+                "Для экспорта в Parquet установите пакет pyarrow"
+            ) from e
+
+        with self.conn.cursor() as plain_cur:
+            sql = self._export_sql(plain_cur, dataset, keyword)
+
+        types = {"str": pa.string(), "int": pa.int64(), "float": pa.float64()}
+        columns = EXPORT_QUERIES[dataset][1]
+        schema = pa.schema([(name, types[kind]) for name, kind in columns])
+
+        total = 0
+
+        # серверный курсор живёт внутри транзакции: без WITH HOLD PostgreSQL
+        # не материализует весь результат до первого FETCH
+        self.conn.autocommit = False
+        try:
+            with self.conn.cursor(name=f"export_{dataset}") as cur:
+                cur.itersize = chunk_size
+                cur.execute(sql)
+                with pq.ParquetWriter(path, schema) as writer:
+                    while True:
+                        rows = cur.fetchmany(chunk_size)
+                        if not rows:
+                            break
+                        arrays = [
+                            pa.array(
+                                [
+                                    float(v) if kind == "float" and v is not None else v
+                                    for v in col
+                                ],
+                                type=types[kind],
+                            )
+                            for col, (_, kind) in zip(zip(*rows), columns)
+                        ]
+                        writer.write_table(
+                            pa.Table.from_arrays(arrays, schema=schema)
+                        )
+                        total += len(rows)
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        finally:
+            self.conn.autocommit = True
+        return total
+
+    def notify_data_loaded(self) -> None:
+        """Сообщает слушателям канала `DATA_LOADED_CHANNEL`, что загрузка завершена."""
+        with self.conn.cursor() as cur:
+            cur.execute(f"NOTIFY {DATA_LOADED_CHANNEL}")
+
     def close(self) -> None:
-        """Закрывает соединение с базой данных."""
-        self.conn.close()
+        """Закрывает соединение с базой данных, если оно было открыто здесь."""
+        if self._owns_conn:
+            self.conn.close()
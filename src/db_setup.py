@@ -1,6 +1,152 @@
+import hashlib
+
 import psycopg2
+from psycopg2 import sql
 from src.config import load_config
 
+# Эталонные CREATE TABLE; {table} подставляется для рабочих и staging-таблиц
+EMPLOYERS_DEF = """
+    CREATE TABLE {table} (
+        employer_id VARCHAR(50) PRIMARY KEY,
+        name VARCHAR(255) NOT NULL,
+        url TEXT NOT NULL,
+        open_vacancies INT
+    )
+"""
+VACANCIES_DEF = """
+    CREATE TABLE {table} (
+        vacancy_id VARCHAR(50),
+        employer_id VARCHAR(50) CONSTRAINT {table}_employer_id_fkey
+            REFERENCES {employers}(employer_id) ON DELETE CASCADE,
+        name VARCHAR(255) NOT NULL,
+        salary_from BIGINT,
+        salary_to BIGINT,
+        salary_currency VARCHAR(3),
+        salary_rub NUMERIC(14,2),
+        url TEXT NOT NULL,
+        content_hash CHAR(32),
+        archived_at TIMESTAMPTZ,
+        PRIMARY KEY ({primary_key})
+    ){partition_by}
+"""
+# Кэш подробностей вакансий: переживает очистку vacancies и обновляется
+# только при изменении content_hash вакансии
+VACANCY_DETAILS_DEF = """
+    CREATE TABLE IF NOT EXISTS vacancy_details (
+        vacancy_id VARCHAR(50) PRIMARY KEY,
+        description TEXT,
+        key_skills TEXT[],
+        experience VARCHAR(50),
+        schedule VARCHAR(50),
+        content_hash CHAR(32),
+        fetched_at TIMESTAMPTZ NOT NULL DEFAULT now()
+    )
+"""
+CURRENCY_RATES_DEF = """
+    CREATE TABLE currency_rates (
+        code VARCHAR(3) PRIMARY KEY,
+        rate NUMERIC(14,6) NOT NULL
+    )
+"""
+
+# История вакансий: только добавление, секции по месяцам снимка. BRIN-индекс
+# по дате почти ничего не весит и хорошо работает, потому что строки
+# дописываются в порядке дат
+VACANCY_SNAPSHOTS_DEF = """
+    CREATE TABLE IF NOT EXISTS vacancy_snapshots (
+        snapshot_date DATE NOT NULL,
+        vacancy_id VARCHAR(50) NOT NULL,
+        employer_id VARCHAR(50) NOT NULL,
+        salary_rub NUMERIC(14,2),
+        salary_currency VARCHAR(3)
+    ) PARTITION BY RANGE (snapshot_date)
+"""
+
+# Вторичные индексы vacancies, которые строятся после загрузки
+VACANCIES_INDEXES = {
+    "employer_id_idx": "employer_id",
+    "salary_rub_idx": "salary_rub",
+    # порядок постраничной выдачи DBManager.get_vacancies_page
+    "page_idx": "(COALESCE(salary_rub, -1)) DESC, vacancy_id DESC",
+}
+
+# Таблицы, которые перезаливаются через staging
+STAGING_TABLES = ("employers", "vacancies")
+
+# Отпечаток схемы: если он совпадает с сохранённым в БД, сверку структуры
+# таблиц через information_schema можно пропустить
+SCHEMA_META_DEF = """
+    CREATE TABLE IF NOT EXISTS schema_meta (
+        key VARCHAR(50) PRIMARY KEY,
+        value TEXT NOT NULL
+    )
+"""
+SCHEMA_FINGERPRINT = hashlib.sha256(
+    "\n".join(
+        [EMPLOYERS_DEF, VACANCIES_DEF, CURRENCY_RATES_DEF, VACANCY_DETAILS_DEF]
+        + [f"{suffix}:{columns}" for suffix, columns in VACANCIES_INDEXES.items()]
+    ).encode("utf-8")
+).hexdigest()
+
+
+def _connect(dbname: str = "hh_db"):
+    """Открывает подключение к базе с параметрами из .env."""
+    config = load_config()
+    return psycopg2.connect(
+        dbname=dbname,
+        user=config["user"],
+        password=config["password"],
+        host=config["host"],
+        port=config["port"],
+    )
+
+
+def _create_vacancies_table(
+    cur, table: str, employers_table: str, partitions: int = 0
+) -> None:
+    """Создаёт таблицу вакансий, при partitions > 0 — с HASH-секциями по employer_id.
+
+    У секционированной таблицы первичный ключ обязан включать ключ
+    секционирования, поэтому он становится составным (vacancy_id, employer_id).
+    """
+    cur.execute(
+        VACANCIES_DEF.format(
+            table=table,
+            employers=employers_table,
+            primary_key="vacancy_id, employer_id" if partitions else "vacancy_id",
+            partition_by=" PARTITION BY HASH (employer_id)" if partitions else "",
+        )
+    )
+    for remainder in range(partitions):
+        cur.execute(
+            f"""
+            CREATE TABLE {table}_p{remainder} PARTITION OF {table}
+            FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})
+            """
+        )
+
+
+def schema_is_current(cur) -> bool:
+    """Проверяет, что таблицы созданы по текущим определениям из этого модуля.
+
+    Сравнивает отпечаток схемы, сохранённый последним `create_tables`,
+    с `SCHEMA_FINGERPRINT`. Стоит один-два запроса вместо сверки каждой
+    таблицы через information_schema.
+    """
+    cur.execute(
+        """
+        SELECT to_regclass('public.schema_meta') IS NOT NULL
+           AND to_regclass('public.employers') IS NOT NULL
+           AND to_regclass('public.vacancies') IS NOT NULL
+           AND to_regclass('public.currency_rates') IS NOT NULL
+        """
+    )
+    if not cur.fetchone()[0]:
+        return False
+    cur.execute("SELECT value FROM schema_meta WHERE key = 'fingerprint'")
+    row = cur.fetchone()
+    return row is not None and row[0] == SCHEMA_FINGERPRINT
+
 
 def create_database() -> None:
     """Создаёт базу данных hh_db, если она ещё не существует."""
@@ -28,45 +174,18 @@ def create_database() -> None:
     conn.close()
 
 
-def create_tables() -> None:
-    """Создаёт таблицы employers, vacancies и currency_rates (или очищает, если структура совпадает)."""
-    config = load_config()
-    conn = psycopg2.connect(
-        dbname="hh_db",
-        user=config["user"],
-        password=config["password"],
-        host=config["host"],
-        port=config["port"],
-    )
-    cur = conn.cursor()
+def create_tables(reset: bool = True, partitions: int = 0) -> None:
+    """Создаёт таблицы employers, vacancies и currency_rates (или очищает, если структура совпадает).
 
-    # Эталонные CREATE TABLE
-    employers_def = """
-        CREATE TABLE employers (
-            employer_id VARCHAR(50) PRIMARY KEY,
-            name VARCHAR(255) NOT NULL,
-            url TEXT NOT NULL,
-            open_vacancies INT
-        )
-    """
-    vacancies_def = """
-        CREATE TABLE vacancies (
-            vacancy_id VARCHAR(50) PRIMARY KEY,
-            employer_id VARCHAR(50) REFERENCES employers(employer_id) ON DELETE CASCADE,
-            name VARCHAR(255) NOT NULL,
-            salary_from BIGINT,
-            salary_to BIGINT,
-            salary_currency VARCHAR(3),
-            salary_rub NUMERIC(14,2),
-            url TEXT NOT NULL
-        )
-    """
-    currency_rates_def = """
-        CREATE TABLE currency_rates (
-            code VARCHAR(3) PRIMARY KEY,
-            rate NUMERIC(14,6) NOT NULL
-        )
+    Args:
+        reset (bool): очищать ли таблицы с совпадающей структурой. В режиме
+            перезаливки через staging таблицы не трогаются, чтобы читатели
+            видели прежние данные до момента подмены.
+        partitions (int): количество HASH-секций vacancies по employer_id
+            (0 — без секционирования).
     """
+    conn = _connect()
+    cur = conn.cursor()
 
     def table_exists(table_name: str) -> bool:
         """Проверяет, существует ли таблица в схеме public."""
@@ -97,6 +216,39 @@ def create_tables() -> None:
         actual = [(row[0], row[1]) for row in cur.fetchall()]
         return actual == expected_columns
 
+    def table_is_partitioned(table_name: str) -> bool:
+        """Проверяет, является ли таблица секционированной."""
+        cur.execute(
+            "SELECT relkind = 'p' FROM pg_class WHERE oid = %s::regclass",
+            (f"public.{table_name}",),
+        )
+        return cur.fetchone()[0]
+
+    def clear_table(table_name: str) -> None:
+        """Очищает таблицу в режиме reset, иначе оставляет данные как есть."""
+        if reset:
+            cur.execute(f"TRUNCATE TABLE {table_name} RESTART IDENTITY CASCADE")
+            print(f"🔄 Таблица {table_name} очищена (структура совпала)")
+        else:
+            print(f"✅ Таблица {table_name} актуальна — данные сохранены")
+
+    # схема не менялась с прошлого запуска — сверку структуры пропускаем
+    if schema_is_current(cur) and (
+        not reset or table_is_partitioned("vacancies") == bool(partitions)
+    ):
+        if reset:
+            cur.execute(
+                "TRUNCATE TABLE employers, vacancies, currency_rates "
+                "RESTART IDENTITY CASCADE"
+            )
+            print("🔄 Таблицы очищены (схема совпала с сохранённой)")
+        else:
+            print("✅ Схема совпала с сохранённой — данные сохранены")
+        conn.commit()
+        cur.close()
+        conn.close()
+        return
+
     # employers
     if table_exists("employers"):
         if table_structure_matches(
@@ -108,14 +260,13 @@ def create_tables() -> None:
                 ("open_vacancies", "integer"),
             ],
         ):
-            cur.execute("TRUNCATE TABLE employers RESTART IDENTITY CASCADE")
-            print("🔄 Таблица employers очищена (структура совпала)")
+            clear_table("employers")
         else:
             cur.execute("DROP TABLE employers CASCADE")
-            cur.execute(employers_def)
+            cur.execute(EMPLOYERS_DEF.format(table="employers"))
             print("♻️ Таблица employers пересоздана (структура изменилась)")
     else:
-        cur.execute(employers_def)
+        cur.execute(EMPLOYERS_DEF.format(table="employers"))
         print("✅ Таблица employers создана")
 
     # vacancies
@@ -131,16 +282,21 @@ def create_tables() -> None:
                 ("salary_currency", "character varying"),
                 ("salary_rub", "numeric"),
                 ("url", "text"),
+                ("content_hash", "character"),
+                ("archived_at", "timestamp with time zone"),
             ],
+        ) and (
+            # при перезаливке секционирование приходит вместе со staging-таблицей
+            not reset
+            or table_is_partitioned("vacancies") == bool(partitions)
         ):
-            cur.execute("TRUNCATE TABLE vacancies RESTART IDENTITY CASCADE")
-            print("🔄 Таблица vacancies очищена (структура совпала)")
+            clear_table("vacancies")
         else:
             cur.execute("DROP TABLE vacancies CASCADE")
-            cur.execute(vacancies_def)
+            _create_vacancies_table(cur, "vacancies", "employers", partitions)
             print("♻️ Таблица vacancies пересоздана (структура изменилась)")
     else:
-        cur.execute(vacancies_def)
+        _create_vacancies_table(cur, "vacancies", "employers", partitions)
         print("✅ Таблица vacancies создана")
 
     # currency_rates
@@ -152,16 +308,148 @@ def create_tables() -> None:
                 ("rate", "numeric"),
             ],
         ):
-            cur.execute("TRUNCATE TABLE currency_rates RESTART IDENTITY CASCADE")
-            print("🔄 Таблица currency_rates очищена (структура совпала)")
+            clear_table("currency_rates")
         else:
             cur.execute("DROP TABLE currency_rates CASCADE")
-            cur.execute(currency_rates_def)
+            cur.execute(CURRENCY_RATES_DEF)
             print("♻️ Таблица currency_rates пересоздана (структура изменилась)")
     else:
-        cur.execute(currency_rates_def)
+        cur.execute(CURRENCY_RATES_DEF)
         print("✅ Таблица currency_rates создана")
 
+    for suffix, columns in VACANCIES_INDEXES.items():
+        cur.execute(
+            f"CREATE INDEX IF NOT EXISTS vacancies_{suffix} ON vacancies ({columns})"
+        )
+    cur.execute(VACANCY_DETAILS_DEF)
+
+    cur.execute(SCHEMA_META_DEF)
+    cur.execute(
+        """
+        INSERT INTO schema_meta (key, value) VALUES ('fingerprint', %s)
+        ON CONFLICT (key) DO UPDATE SET value = EXCLUDED.value
+        """,
+        (SCHEMA_FINGERPRINT,),
+    )
+
+    conn.commit()
+    cur.close()
+    conn.close()
+
+
+def create_snapshot_table() -> None:
+    """Создаёт секционированную таблицу vacancy_snapshots с BRIN-индексом."""
+    conn = _connect()
+    cur = conn.cursor()
+
+    cur.execute(VACANCY_SNAPSHOTS_DEF)
+    cur.execute(
+        """
+        CREATE INDEX IF NOT EXISTS vacancy_snapshots_date_brin
+        ON vacancy_snapshots USING brin (snapshot_date)
+        """
+    )
+
+    conn.commit()
+    cur.close()
+    conn.close()
+
+
+def create_staging_tables(partitions: int = 0) -> None:
+    """Создаёт пустые staging-таблицы employers_staging и vacancies_staging.
+
+    Новые данные загружаются в них, пока рабочие таблицы продолжают
+    обслуживать запросы. Оставшиеся от прерванной перезаливки таблицы
+    удаляются.
+
+    Args:
+        partitions (int): количество HASH-секций vacancies по employer_id
+            (0 — без секционирования).
+    """
+    conn = _connect()
+    cur = conn.cursor()
+
+    cur.execute("DROP TABLE IF EXISTS vacancies_staging, employers_staging CASCADE")
+    cur.execute(EMPLOYERS_DEF.format(table="employers_staging"))
+    _create_vacancies_table(cur, "vacancies_staging", "employers_staging", partitions)
+
+    conn.commit()
+    cur.close()
+    conn.close()
+    print("🧱 Staging-таблицы созданы")
+
+
+def swap_staging_tables(lock_timeout: str = "5s") -> None:
+    """Строит индексы на staging-таблицах и атомарно подменяет ими рабочие.
+
+    Индексы и статистика готовятся до подмены, без блокировки рабочих
+    таблиц. Сама подмена — удаление старых таблиц и переименование staging
+    вместе с их секциями, индексами и ограничениями — выполняется одной
+    транзакцией, так что читатели видят либо старые, либо новые данные.
+
+    Args:
+        lock_timeout (str): сколько ждать блокировку рабочих таблиц, прежде
+            чем отказаться от подмены (значение для SET lock_timeout).
+    """
+    conn = _connect()
+    cur = conn.cursor()
+
+    for suffix, columns in VACANCIES_INDEXES.items():
+        cur.execute(
+            f"CREATE INDEX vacancies_staging_{suffix} ON vacancies_staging ({columns})"
+        )
+    for table in STAGING_TABLES:
+        cur.execute(f"ANALYZE {table}_staging")
+    conn.commit()
+
+    cur.execute("SET LOCAL lock_timeout = %s", (lock_timeout,))
+    cur.execute("DROP TABLE IF EXISTS vacancies, employers CASCADE")
+
+    # переименовываем таблицы, секции и индексы: *_staging* -> *
+    patterns = [f"{table}\\_staging%" for table in STAGING_TABLES]
+    cur.execute(
+        """
+        SELECT c.relname, c.relkind IN ('i', 'I')
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = 'public'
+          AND c.relkind IN ('r', 'p', 'i', 'I')
+          AND c.relname LIKE ANY(%s)
+        """,
+        (patterns,),
+    )
+    for relname, is_index in cur.fetchall():
+        cur.execute(
+            sql.SQL("ALTER {} {} RENAME TO {}").format(
+                sql.SQL("INDEX" if is_index else "TABLE"),
+                sql.Identifier(relname),
+                sql.Identifier(relname.replace("_staging", "", 1)),
+            )
+        )
+
+    # только собственный внешний ключ vacancies: его копии в секциях
+    # наследуются, и переименовать их можно не во всех версиях PostgreSQL.
+    # Имя задано явно в VACANCIES_DEF, поэтому копии со старым именем не
+    # мешают следующей staging-таблице получить то же имя
+    cur.execute(
+        """
+        SELECT conname
+        FROM pg_constraint
+        WHERE contype = 'f'
+          AND conparentid = 0
+          AND conrelid = 'public.vacancies'::regclass
+          AND conname LIKE 'vacancies\\_staging%'
+        """
+    )
+    for (conname,) in cur.fetchall():
+        cur.execute(
+            sql.SQL("ALTER TABLE vacancies RENAME CONSTRAINT {} TO {}").format(
+                sql.Identifier(conname),
+                sql.Identifier(conname.replace("_staging", "", 1)),
+            )
+        )
+
     conn.commit()
     cur.close()
     conn.close()
+    print("🔁 Рабочие таблицы атомарно заменены данными из staging")
@@ -0,0 +1,41 @@
+from src.api_hh import CircuitOpenError, HeadHunterAPI
+from src.db_manager import DBManager
+
+
+def enrich_vacancies(
+    hh: HeadHunterAPI, max_workers: int = 8, batch_size: int = 500
+) -> None:
+    """Догружает описание, навыки, опыт и график для вакансий из БД.
+
+    Запрашиваются только вакансии без подробностей или с изменившимся
+    `content_hash`, поэтому повторный запуск обходится в число новых и
+    изменённых вакансий. Результаты сохраняются порциями, чтобы прерванный
+    запуск не терял уже загруженное.
+
+    Args:
+        hh (HeadHunterAPI): клиент API с общим ограничением частоты запросов.
+        max_workers (int): количество одновременных запросов.
+        batch_size (int): количество вакансий в одной сохраняемой порции.
+    """
+    with DBManager() as db:
+        pending = db.get_vacancies_without_details()
+        if not pending:
+            print("📝 Подробности всех вакансий уже загружены")
+            return
+
+        print(f"📝 Загружаем подробности для {len(pending)} вакансий...")
+        loaded = 0
+        for start in range(0, len(pending), batch_size):
+            batch = dict(pending[start : start + batch_size])
+            try:
+                details = hh.get_vacancy_details(list(batch), max_workers=max_workers)
+            except CircuitOpenError as e:
+                # API недоступен: оставшиеся вакансии запросим при следующем запуске
+                print(
+                    f"{e}\n⏭ Загрузка подробностей остановлена, "
+                    f"осталось {len(pending) - start} вакансий"
+                )
+                break
+            db.save_vacancy_details(details, batch)
+            loaded += len(details)
+            print(f"📝 Загружено {loaded} / {len(pending)}")
@@ -0,0 +1,44 @@
+import argparse
+
+from src.db_manager import EXPORT_QUERIES, DBManager
+
+
+def export_data(
+    dataset: str, path: str, fmt: str = "csv", keyword: str | None = None
+) -> None:
+    """Выгружает набор данных из БД в файл CSV или Parquet.
+
+    Args:
+        dataset (str): имя набора данных ("companies", "vacancies",
+            "higher_salary", "keyword").
+        path (str): путь к итоговому файлу.
+        fmt (str): формат файла — "csv" или "parquet".
+        keyword (str | None): ключевое слово для набора "keyword".
+    """
+    with DBManager() as db:
+        if fmt == "csv":
+            db.export_to_csv(dataset, path, keyword)
+            print(f"📤 Набор '{dataset}' выгружен в {path}")
+        elif fmt == "parquet":
+            total = db.export_to_parquet(dataset, path, keyword)
+            print(f"📤 Набор '{dataset}' выгружен в {path} ({total} строк)")
+        else:
+            raise ValueError(f"Неизвестный формат '{fmt}', доступны: csv, parquet")
+
+
+def main() -> None:
+    """Точка входа для выгрузки: `python -m src.export vacancies out.csv`."""
+    parser = argparse.ArgumentParser(description="Выгрузка данных о вакансиях")
+    parser.add_argument("dataset", choices=list(EXPORT_QUERIES))
+    parser.add_argument("path")
+    parser.add_argument("--format", dest="fmt", choices=["csv", "parquet"])
+    parser.add_argument("--keyword")
+    args = parser.parse_args()
+
+    # формат по умолчанию определяем по расширению файла
+    fmt = args.fmt or ("parquet" if args.path.endswith(".parquet") else "csv")
+    export_data(args.dataset, args.path, fmt, args.keyword)
+
+
+if __name__ == "__main__":
+    main()
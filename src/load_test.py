@@ -0,0 +1,106 @@
+import argparse
+import threading
+import time
+import urllib.request
+
+DEFAULT_PATHS = [
+    "/companies",
+    "/vacancies?limit=50",
+    "/vacancies?keyword=Python&limit=50",
+    "/vacancies?higher_salary=1&limit=50",
+    "/salary/avg",
+    "/salary/percentiles",
+    "/salary/histogram?buckets=10",
+    "/salary/by-employer",
+]
+
+
+def run_load_test(
+    base_url: str,
+    paths: list[str] | None = None,
+    concurrency: int = 32,
+    duration: float = 10.0,
+) -> dict[str, float]:
+    """Нагружает сервер запросов и измеряет пропускную способность и задержки.
+
+    Каждый поток по кругу запрашивает `paths`, пока не истечёт `duration`.
+
+    Args:
+        base_url (str): адрес сервера, например "http://127.0.0.1:8000".
+        paths (list[str] | None): пути запросов, по умолчанию все эндпоинты.
+        concurrency (int): количество параллельных клиентов.
+        duration (float): длительность теста в секундах.
+
+    Returns:
+        dict[str, float]: requests, errors, rps и задержки p50/p95/p99 в мс.
+    """
+    paths = paths or DEFAULT_PATHS
+    latencies: list[float] = []
+    errors = 0
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def worker(offset: int) -> None:
+        nonlocal errors
+        local: list[float] = []
+        local_errors = 0
+        i = offset
+        while time.monotonic() < deadline:
+            start = time.monotonic()
+            try:
+                with urllib.request.urlopen(base_url + paths[i % len(paths)]) as resp:
+                    resp.read()
+                local.append(time.monotonic() - start)
+            except OSError:
+                local_errors += 1
+            i += 1
+        with lock:
+            latencies.extend(local)
+            errors += local_errors
+
+    threads = [
+        threading.Thread(target=worker, args=(n,)) for n in range(concurrency)
+    ]
+    started = time.monotonic()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.monotonic() - started
+
+    latencies.sort()
+
+    def percentile(p: float) -> float:
+        if not latencies:
+            return 0.0
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+    }
+
+
+def main() -> None:
+    """Точка входа: `python -m src.load_test --url http://127.0.0.1:8000`."""
+    parser = argparse.ArgumentParser(description="Нагрузочный тест сервера запросов")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("paths", nargs="*")
+    args = parser.parse_args()
+
+    result = run_load_test(args.url, args.paths, args.concurrency, args.duration)
+    print(
+        f"📈 {result['requests']} запросов, ошибок: {result['errors']}, "
+        f"{result['rps']:.0f} RPS, p50 {result['p50_ms']:.1f} мс, "
+        f"p95 {result['p95_ms']:.1f} мс, p99 {result['p99_ms']:.1f} мс"
+    )
+
+
+if __name__ == "__main__":
+    main()
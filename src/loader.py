@@ -1,13 +1,48 @@
 from src.db_manager import DBManager
 
 
-def insert_data(data: dict) -> None:
+def insert_data(data: dict, staging: bool = False) -> None:
     """Сохраняет данные о работодателях и вакансиях в базу данных.
 
     Args:
         data (dict): Словарь с данными, содержащий ключи:
             - "employers": список словарей с информацией о работодателях.
             - "vacancies": список словарей с информацией о вакансиях.
+        staging (bool): загружать в staging-таблицы для последующей подмены.
     """
     with DBManager() as db:
-        db.insert_data(data)
+        db.insert_data(data, staging=staging)
+
+
+def save_snapshot(retention_months: int = 12) -> None:
+    """Дописывает текущие вакансии в историю и удаляет устаревшие месяцы.
+
+    Args:
+        retention_months (int): сколько последних месяцев истории хранить.
+    """
+    with DBManager() as db:
+        written = db.take_snapshot()
+        dropped = db.drop_old_snapshots(retention_months)
+    print(f"🗂 В историю записано вакансий: {written}")
+    if dropped:
+        print(f"🗑 Удалены устаревшие секции истории: {', '.join(dropped)}")
+
+
+def notify_data_loaded() -> None:
+    """Сообщает запущенным сервисам, что данные в БД обновлены."""
+    with DBManager() as db:
+        db.notify_data_loaded()
+
+
+def merge_data(data: dict) -> None:
+    """Применяет к базе только изменения: новые, изменённые и закрытые вакансии.
+
+    Args:
+        data (dict): Словарь с данными в формате `insert_data`.
+    """
+    with DBManager() as db:
+        stats = db.merge_data(data)
+    print(
+        f"🧩 Записано вакансий: {stats['written']}, без изменений: "
+        f"{stats['unchanged']}, перенесено в архив: {stats['archived']}"
+    )
@@ -0,0 +1,234 @@
+from decimal import ROUND_FLOOR, ROUND_HALF_UP, Decimal, localcontext
+from typing import Any
+
+import numpy as np
+
+from src.db_manager import DBManager
+
+VacancyRow = tuple[str, str, float | None, float | None, str | None, float | None, str]
+
+
+def _numeric_avg(total: Decimal, count: int) -> Decimal:
+    """Делит сумму на количество так же, как AVG(numeric) в PostgreSQL.
+
+    Масштаб результата выбирается по правилу select_div_scale: не меньше
+    16 значащих цифр (разряды считаются группами по 4) и не меньше масштаба
+    суммы; округление — половина от нуля.
+    """
+
+    def weight(value: Decimal) -> tuple[int, int]:
+        # вес и старшая «цифра» числа в системе счисления по основанию 10000
+        if not value:
+            return 0, 0
+        w = value.adjusted() // 4
+        return w, int(abs(value).scaleb(-4 * w))
+
+    weight1, first1 = weight(total)
+    weight2, first2 = weight(Decimal(count))
+    qweight = weight1 - weight2 - (1 if first1 <= first2 else 0)
+    scale = max(16 - qweight * 4, -total.as_tuple().exponent, 0)
+    with localcontext() as ctx:
+        ctx.prec = 60
+        return (total / count).quantize(Decimal(1).scaleb(-scale), ROUND_HALF_UP)
+
+
+class InMemoryDBManager:
+    """Колоночный in-memory аналог DBManager на NumPy.
+
+    Таблицы employers и vacancies загружаются один раз и хранятся в виде
+    массивов-колонок: зарплата в рублях (float64, NaN вместо NULL), коды
+    работодателей и коды интернированных названий вакансий. Методы выборки
+    совпадают с DBManager по имени и возвращают такие же кортежи, но
+    считаются векторно, без обращения к PostgreSQL.
+
+    Суммы зарплат считаются в копейках в int64, поэтому средние совпадают
+    с NUMERIC-результатом PostgreSQL и возвращаются как Decimal.
+    """
+
+    def __init__(
+        self,
+        employers: list[tuple[str, str]],
+        vacancies: list[tuple[Any, ...]],
+    ) -> None:
+        """Строит колонки из строк таблиц.
+
+        Args:
+            employers (list[tuple[str, str]]): строки (employer_id, name).
+            vacancies (list[tuple[Any, ...]]): строки (vacancy_id, employer_id,
+                name, salary_from, salary_to, salary_currency, salary_rub, url).
+        """
+        # в SQL компании группируются по названию, поэтому кодируем именно его
+        self.company_names, name_codes = np.unique(
+            np.array([name for _, name in employers], dtype=object).astype(str),
+            return_inverse=True,
+        )
+        employer_code = dict(zip((emp_id for emp_id, _ in employers), name_codes))
+
+        columns = list(zip(*vacancies)) if vacancies else [()] * 8
+        (_, emp_ids, titles, salary_from, salary_to, currency, salary_rub, url) = (
+            columns
+        )
+
+        # вакансии без работодателя не попадают в JOIN — помечаем их кодом -1
+        self.employer_codes = np.array(
+            [employer_code.get(emp_id, -1) for emp_id in emp_ids], dtype=np.int64
+        )
+        self.salary_rub = np.array(
+            [np.nan if s is None else float(s) for s in salary_rub], dtype=np.float64
+        )
+        # NUMERIC(14,2) в копейках: точные суммы без ошибок округления float
+        self.salary_cents = np.array(
+            [0 if s is None else int(Decimal(str(s)) * 100) for s in salary_rub],
+            dtype=np.int64,
+        )
+
+        # интернирование названий: поиск по ключевому слову идёт по уникальным строкам
+        self.titles, self.title_codes = np.unique(
+            np.array(titles, dtype=str), return_inverse=True
+        )
+        self._titles_lower = np.char.lower(self.titles)
+
+        # исходные значения храним как есть, чтобы кортежи совпадали с DBManager
+        self._title_obj = np.array(titles, dtype=object)
+        self._salary_from = np.array(salary_from, dtype=object)
+        self._salary_to = np.array(salary_to, dtype=object)
+        self._currency = np.array(currency, dtype=object)
+        self._salary_obj = np.array(salary_rub, dtype=object)
+        self._url = np.array(url, dtype=object)
+        self._company_obj = np.array(
+            [str(name) for name in self.company_names], dtype=object
+        )
+
+    @classmethod
+    def from_db(cls, db: DBManager | None = None) -> "InMemoryDBManager":
+        """Загружает таблицы из PostgreSQL одним проходом.
+
+        Args:
+            db (DBManager | None): открытое подключение; если не передано,
+                создаётся временное.
+
+        Returns:
+            InMemoryDBManager: готовый к запросам экземпляр.
+        """
+        owner = db is None
+        db = db or DBManager()
+        try:
+            with db.conn.cursor() as cur:
+                cur.execute("SELECT employer_id, name FROM employers")
+                employers = cur.fetchall()
+                cur.execute(
+                    """
+                    SELECT vacancy_id, employer_id, name, salary_from, salary_to,
+                           salary_currency, salary_rub, url
+                    FROM vacancies
+                    WHERE archived_at IS NULL
+                    """
+                )
+                vacancies = cur.fetchall()
+        finally:
+            if owner:
+                db.close()
+        return cls(employers, vacancies)
+
+    def _rows(self, idx: np.ndarray, company_first: bool) -> list[VacancyRow]:
+        """Собирает кортежи вакансий по массиву индексов."""
+        company = self._company_obj[self.employer_codes[idx]]
+        title = self._title_obj[idx]
+        first, second = (company, title) if company_first else (title, company)
+        return list(
+            zip(
+                first,
+                second,
+                self._salary_from[idx],
+                self._salary_to[idx],
+                self._currency[idx],
+                self._salary_obj[idx],
+                self._url[idx],
+            )
+        )
+
+    def _order_by_salary(self, idx: np.ndarray) -> np.ndarray:
+        """Сортирует индексы по зарплате по убыванию, NULL — в конце."""
+        keys = -self.salary_rub[idx]
+        keys[np.isnan(keys)] = np.inf
+        return idx[np.argsort(keys, kind="stable")]
+
+    def get_companies_and_vacancies_count(self) -> list[tuple[str, int, float | None]]:
+        """Возвращает список компаний с количеством вакансий и средней зарплатой.
+
+        Returns:
+            list[tuple[str, int, float | None]]: список кортежей вида
+                (название компании, количество вакансий, средняя зарплата в рублях).
+        """
+        size = len(self.company_names)
+        joined = self.employer_codes >= 0
+        with_salary = joined & ~np.isnan(self.salary_rub)
+
+        counts = np.bincount(self.employer_codes[joined], minlength=size)
+        salary_counts = np.bincount(self.employer_codes[with_salary], minlength=size)
+        sums = np.zeros(size, dtype=np.int64)
+        codes = self.employer_codes[with_salary]
+        np.add.at(sums, codes, self.salary_cents[with_salary])
+        with np.errstate(invalid="ignore", divide="ignore"):
+            avg = sums / salary_counts
+
+        # ORDER BY AVG DESC (в PostgreSQL NULL идут первыми), COUNT DESC
+        avg_key = np.where(np.isnan(avg), -np.inf, -avg)
+        order = np.lexsort((-counts, avg_key))
+        cent = Decimal("0.01")
+        return [
+            (
+                str(self.company_names[i]),
+                int(counts[i]),
+                (
+                    None
+                    if salary_counts[i] == 0
+                    else _numeric_avg(
+                        Decimal(int(sums[i])).scaleb(-2), int(salary_counts[i])
+                    ).quantize(cent, ROUND_HALF_UP)
+                ),
+            )
+            for i in order
+        ]
+
+    def get_all_vacancies(self) -> list[VacancyRow]:
+        """Возвращает все вакансии с указанием компании и зарплаты."""
+        idx = np.flatnonzero(self.employer_codes >= 0)
+        return self._rows(self._order_by_salary(idx), company_first=True)
+
+    def get_avg_salary(self) -> Decimal | None:
+        """Вычисляет среднюю зарплату по всем вакансиям в рублях.
+
+        Returns:
+            Decimal | None: среднее значение зарплаты (в рублях) или None.
+        """
+        with_salary = ~np.isnan(self.salary_rub)
+        count = int(with_salary.sum())
+        if not count:
+            return None
+        total = Decimal(int(self.salary_cents[with_salary].sum())).scaleb(-2)
+        return _numeric_avg(total, count)
+
+    def get_vacancies_with_higher_salary(self) -> list[VacancyRow]:
+        """Возвращает вакансии, где зарплата (в рублях) выше средней."""
+        avg = self.get_avg_salary()
+        if avg is None:
+            return []
+        # salary_rub > avg в копейках: целое сравнение с округлённым вниз порогом
+        threshold = int((avg * 100).to_integral_value(rounding=ROUND_FLOOR))
+        mask = (
+            (self.salary_cents > threshold)
+            & ~np.isnan(self.salary_rub)
+            & (self.employer_codes >= 0)
+        )
+        return self._rows(self._order_by_salary(np.flatnonzero(mask)), False)
+
+    def get_vacancies_with_keyword(self, keyword: str) -> list[VacancyRow]:
+        """Ищет вакансии по ключевому слову в названии (без учёта регистра).
+
+        Args:
+            keyword (str): слово для поиска.
+        """
+        matched_titles = np.char.find(self._titles_lower, keyword.lower()) >= 0
+        mask = matched_titles[self.title_codes] & (self.employer_codes >= 0)
+        return self._rows(self._order_by_salary(np.flatnonzero(mask)), False)
@@ -79,6 +79,44 @@ def print_avg_salary(avg: float | None) -> None:
         print("Нет данных для расчета.")
 
 
+def print_salary_percentiles(
+    percentiles: tuple[float | None, float | None, float | None]
+) -> None:
+    """Выводит медиану и 10-й/90-й перцентили зарплаты."""
+    print("\n📐 Распределение зарплат:")
+    p10, median, p90 = percentiles
+    if median is None:
+        print("Нет данных для расчета.")
+        return
+    for label, value in (("P10", p10), ("Медиана", median), ("P90", p90)):
+        print(f"{label}: {value:,.0f} руб.".replace(",", " "))
+
+
+def print_salary_histogram(
+    histogram: list[tuple[int, float, float, int]], width: int = 40
+) -> None:
+    """Выводит гистограмму зарплат в виде текстовых полос."""
+    print("\n📊 Гистограмма зарплат:")
+    if not histogram:
+        print("Нет данных.")
+        return
+    peak = max(count for *_, count in histogram) or 1
+    for _, lower, upper, count in histogram:
+        bar = "█" * round(count / peak * width)
+        print(f"{lower:>12,.0f} – {upper:>12,.0f} | {bar} {count}".replace(",", " "))
+
+
+def print_salary_stats_by_employer(
+    stats: list[
+        tuple[str, int, float | None, float | None, float | None, float | None]
+    ],
+    limit: int = 10,
+) -> None:
+    """Выводит перцентили и среднюю зарплату по каждой компании."""
+    headers = ["Компания", "С зарплатой", "P10", "Медиана", "P90", "Средняя"]
+    _print_paginated(stats, headers, "🏢 Зарплаты по компаниям:", limit)
+
+
 def print_higher_salary_vacancies(
     vacancies: list[
         tuple[str, str, float | None, float | None, str | None, float | None, str]
@@ -0,0 +1,347 @@
+import argparse
+import json
+import select
+import threading
+from collections import OrderedDict
+from datetime import date
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable
+from urllib.parse import parse_qs, urlparse
+
+import psycopg2
+from psycopg2.pool import ThreadedConnectionPool
+
+from src.config import load_config
+from src.db_manager import DATA_LOADED_CHANNEL, DBManager
+
+VACANCY_FIELDS = [
+    "vacancy_id",
+    "vacancy",
+    "company",
+    "salary_from",
+    "salary_to",
+    "salary_currency",
+    "salary_rub",
+    "url",
+]
+
+
+class ResponseCache:
+    """Потокобезопасный LRU-кэш готовых JSON-ответов.
+
+    Каждая очистка увеличивает `generation`. Ответ, посчитанный до очистки,
+    не попадает в кэш: запрос запоминает поколение до обращения к БД и
+    передаёт его в `put`.
+    """
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        self.maxsize = maxsize
+        self.generation = 0
+        self._data: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> bytes | None:
+        """Возвращает ответ из кэша и отмечает его как недавно использованный."""
+        with self._lock:
+            body = self._data.get(key)
+            if body is not None:
+                self._data.move_to_end(key)
+            return body
+
+    def put(self, key: str, body: bytes, generation: int | None = None) -> None:
+        """Сохраняет ответ, вытесняя самый давно использованный.
+
+        Args:
+            key (str): ключ ответа.
+            body (bytes): тело ответа.
+            generation (int | None): поколение кэша на момент начала запроса;
+                если кэш с тех пор очищали, ответ устарел и не сохраняется.
+        """
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._data[key] = body
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """Очищает кэш и начинает новое поколение."""
+        with self._lock:
+            self._data.clear()
+            self.generation += 1
+
+
+def _json_default(value: Any) -> Any:
+    """Сериализует NUMERIC-значения и даты из PostgreSQL."""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Нельзя сериализовать {type(value).__name__}")
+
+
+def _rows(rows: list[tuple[Any, ...]], fields: list[str]) -> list[dict[str, Any]]:
+    """Превращает кортежи в словари с именами полей."""
+    return [dict(zip(fields, row)) for row in rows]
+
+
+def _bounded(query: dict[str, str], name: str, maximum: int) -> dict[str, int]:
+    """Числовой параметр запроса, ограниченный сверху `maximum`.
+
+    Returns:
+        dict[str, int]: {name: значение} для передачи в метод DBManager или
+            пустой словарь, если параметр не задан (берётся значение метода
+            по умолчанию).
+
+    Raises:
+        ValueError: если значение не число или меньше 1.
+    """
+    if name not in query:
+        return {}
+    value = int(query[name])
+    if value < 1:
+        raise ValueError(f"Параметр {name} должен быть не меньше 1")
+    return {name: min(value, maximum)}
+
+
+def _vacancies_page(db: DBManager, query: dict[str, str]) -> dict[str, Any]:
+    """Страница вакансий; курсор следующей страницы — ключ последней строки."""
+    limit = _bounded(query, "limit", 1000).get("limit", 100)
+    after = None
+    if query.get("cursor"):
+        sort_key, vacancy_id = query["cursor"].split("|", 1)
+        after = (sort_key, vacancy_id)
+
+    rows = db.get_vacancies_page(
+        keyword=query.get("keyword"),
+        higher_salary=query.get("higher_salary") in ("1", "true"),
+        after=after,
+        limit=limit,
+    )
+    next_cursor = f"{rows[-1][-1]}|{rows[-1][0]}" if len(rows) == limit else None
+    return {
+        "items": _rows([row[:-1] for row in rows], VACANCY_FIELDS),
+        "next_cursor": next_cursor,
+    }
+
+
+def _percentiles(db: DBManager, query: dict[str, str]) -> dict[str, Any]:
+    """Перцентили зарплаты в виде словаря."""
+    p10, median, p90 = db.get_salary_percentiles()
+    return {"p10": p10, "median": median, "p90": p90}
+
+
+# Маршрут -> функция (DBManager, параметры запроса) -> данные для JSON
+ROUTES: dict[str, Callable[[DBManager, dict[str, str]], Any]] = {
+    "/companies": lambda db, q: _rows(
+        db.get_companies_and_vacancies_count(),
+        ["company", "vacancies_count", "avg_salary_rub"],
+    ),
+    "/vacancies": _vacancies_page,
+    "/salary/avg": lambda db, q: {"avg_salary_rub": db.get_avg_salary()},
+    "/salary/percentiles": _percentiles,
+    "/salary/histogram": lambda db, q: _rows(
+        db.get_salary_histogram(**_bounded(q, "buckets", 100)),
+        ["bucket", "lower", "upper", "count"],
+    ),
+    "/salary/by-employer": lambda db, q: _rows(
+        db.get_salary_stats_by_employer(),
+        ["company", "with_salary", "p10", "median", "p90", "avg_salary_rub"],
+    ),
+    "/salary/by-currency": lambda db, q: _rows(
+        db.get_salary_stats_by_currency(),
+        ["currency", "vacancies_count", "median_rub", "avg_salary_rub"],
+    ),
+    "/trends/salary": lambda db, q: _rows(
+        db.get_salary_trend_by_employer(**_bounded(q, "weeks", 104)),
+        ["company", "week", "vacancies_count", "median_rub"],
+    ),
+    "/trends/count": lambda db, q: _rows(
+        db.get_vacancy_count_trend(**_bounded(q, "days", 730)),
+        ["date", "vacancies_count", "median_rub"],
+    ),
+}
+
+
+class QueryServer(ThreadingHTTPServer):
+    """HTTP-сервер только для чтения поверх DBManager.
+
+    Каждый запрос берёт соединение из пула (если свободных нет — ждёт
+    его освобождения), готовые ответы хранятся в LRU-кэше. Кэш очищается,
+    когда загрузчик отправляет NOTIFY в канал `DATA_LOADED_CHANNEL`.
+    """
+
+    daemon_threads = True
+    # как часто слушатель NOTIFY проверяет остановку сервера, секунды
+    listen_poll = 5.0
+    # пауза между попытками переподключения слушателя: от и до, секунды
+    listen_backoff = (1.0, 30.0)
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        pool_size: int = 10,
+        cache_size: int = 1024,
+    ) -> None:
+        super().__init__(address, QueryHandler)
+        config = load_config()
+        self.db_params = {
+            "dbname": "hh_db",
+            "user": config["user"],
+            "password": config["password"],
+            "host": config["host"],
+            "port": config["port"],
+        }
+        self.pool = ThreadedConnectionPool(1, pool_size, **self.db_params)
+        # ThreadedConnectionPool не ждёт свободного соединения, а бросает
+        # PoolError, поэтому число одновременных запросов ограничиваем сами
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self.cache = ResponseCache(cache_size)
+        self._stopped = threading.Event()
+        self._listener = threading.Thread(target=self._listen, daemon=True)
+        self._listener.start()
+
+    def _listen(self) -> None:
+        """Слушает уведомления о завершении загрузки и сбрасывает кэш.
+
+        При обрыве соединения (перезапуск БД, сбой сети) переподключается
+        с нарастающей паузой. После каждого подключения кэш очищается:
+        уведомления, пришедшие во время обрыва, потеряны.
+        """
+        delay, max_delay = self.listen_backoff
+        connected_before = False
+        while not self._stopped.is_set():
+            try:
+                conn = psycopg2.connect(**self.db_params)
+            except psycopg2.OperationalError as e:
+                print(f"⚠️ Нет соединения для LISTEN, повтор через {delay:.0f} с: {e}")
+                self._stopped.wait(delay)
+                delay = min(delay * 2, max_delay)
+                continue
+            try:
+                conn.autocommit = True
+                with conn.cursor() as cur:
+                    cur.execute(f"LISTEN {DATA_LOADED_CHANNEL}")
+                delay = self.listen_backoff[0]
+                self.cache.clear()
+                if connected_before:
+                    print("🔄 Соединение LISTEN восстановлено — кэш ответов очищен")
+                connected_before = True
+                self._wait_notifies(conn)
+            except psycopg2.OperationalError as e:
+                print(f"⚠️ Соединение LISTEN потеряно: {e}")
+                self._stopped.wait(delay)
+            finally:
+                conn.close()
+
+    def _wait_notifies(self, conn: Any) -> None:
+        """Очищает кэш по каждому уведомлению, пока сервер не остановлен."""
+        while not self._stopped.is_set():
+            if select.select([conn], [], [], self.listen_poll) == ([], [], []):
+                continue
+            conn.poll()
+            if conn.notifies:
+                conn.notifies.clear()
+                self.cache.clear()
+                print("🧹 Данные обновлены — кэш ответов очищен")
+
+    def query(self, path: str, query: dict[str, str]) -> bytes:
+        """Выполняет запрос к БД через соединение из пула и возвращает JSON."""
+        with self._slots:
+            conn = self.pool.getconn()
+            try:
+                data = ROUTES[path](DBManager(conn=conn), query)
+            finally:
+                self.pool.putconn(conn)
+        return json.dumps(data, ensure_ascii=False, default=_json_default).encode()
+
+    def server_close(self) -> None:
+        """Останавливает сервер и закрывает соединения пула."""
+        super().server_close()
+        self._stopped.set()
+        self.pool.closeall()
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    """Обработчик GET-запросов к эндпоинтам из `ROUTES`."""
+
+    server: QueryServer
+
+    def do_GET(self) -> None:
+        """Отдаёт ответ из кэша или выполняет запрос к БД."""
+        url = urlparse(self.path)
+        if url.path == "/health":
+            self._send(200, b'{"status": "ok"}')
+            return
+        if url.path not in ROUTES:
+            self._send(404, b'{"error": "not found"}')
+            return
+
+        body = self.server.cache.get(self.path)
+        if body is None:
+            generation = self.server.cache.generation
+            query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            try:
+                body = self.server.query(url.path, query)
+            except (ValueError, psycopg2.DataError) as e:
+                error = json.dumps({"error": str(e)}, ensure_ascii=False)
+                self._send(400, error.encode())
+                return
+            except Exception as e:
+                print(f"❌ Ошибка запроса {self.path}: {e}")
+                self._send(500, b'{"error": "internal server error"}')
+                return
+            self.server.cache.put(self.path, body, generation)
+        self._send(200, body)
+
+    def _send(self, status: int, body: bytes) -> None:
+        """Отправляет JSON-ответ."""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """Отключает построчный лог запросов, чтобы не тормозить сервер."""
+
+
+def serve(
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    pool_size: int = 10,
+    cache_size: int = 1024,
+) -> None:
+    """Запускает HTTP-сервер запросов до прерывания (Ctrl+C).
+
+    Args:
+        host (str): адрес для прослушивания.
+        port (int): порт.
+        pool_size (int): максимальное количество соединений с БД.
+        cache_size (int): количество ответов в LRU-кэше.
+    """
+    server = QueryServer((host, port), pool_size=pool_size, cache_size=cache_size)
+    print(f"🌐 Сервер запросов запущен на http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("👋 Сервер остановлен")
+    finally:
+        server.server_close()
+
+
+def main() -> None:
+    """Точка входа: `python -m src.query_server --port 8000`."""
+    parser = argparse.ArgumentParser(description="HTTP-сервер запросов к hh_db")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--pool-size", type=int, default=10)
+    parser.add_argument("--cache-size", type=int, default=1024)
+    args = parser.parse_args()
+    serve(args.host, args.port, args.pool_size, args.cache_size)
+
+
+if __name__ == "__main__":
+    main()
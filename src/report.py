@@ -0,0 +1,154 @@
+import csv
+import json
+import sys
+from decimal import Decimal
+from typing import Any, Callable
+
+from src.db_manager import (
+    ALL_VACANCIES_SQL,
+    BY_CURRENCY_SQL,
+    BY_EMPLOYER_SQL,
+    COMPANIES_SQL,
+    HIGHER_SALARY_SQL,
+    KEYWORD_SQL,
+    DBManager,
+    with_limit,
+)
+from src.db_setup import schema_is_current
+
+VACANCY_HEADERS = ["От", "До", "Валюта", "Средняя зарплата в RUB", "Ссылка"]
+
+
+def _sql_report(
+    sql: str, params: Callable[[str | None], tuple[Any, ...]] = lambda kw: ()
+) -> Callable[[DBManager, str | None, int | None], list[tuple[Any, ...]]]:
+    """Отчёт из SQL-запроса DBManager; лимит строк добавляется в сам запрос.
+
+    Args:
+        sql (str): запрос с позиционными параметрами %s.
+        params (Callable): строит параметры запроса из ключевого слова.
+    """
+
+    def query(
+        db: DBManager, keyword: str | None, limit: int | None
+    ) -> list[tuple[Any, ...]]:
+        with db.conn.cursor() as cur:
+            cur.execute(*with_limit(sql, params(keyword), limit))
+            return cur.fetchall()
+
+    return query
+
+
+# Отчёт -> (функция выборки (БД, ключевое слово, лимит), заголовки колонок)
+REPORTS: dict[
+    str,
+    tuple[Callable[[DBManager, str | None, int | None], Any], list[str]],
+] = {
+    "companies": (
+        _sql_report(COMPANIES_SQL),
+        ["Компания", "Количество вакансий", "Средняя зарплата в RUB"],
+    ),
+    "vacancies": (
+        _sql_report(ALL_VACANCIES_SQL),
+        ["Компания", "Вакансия"] + VACANCY_HEADERS,
+    ),
+    "higher_salary": (
+        _sql_report(HIGHER_SALARY_SQL),
+        ["Вакансия", "Компания"] + VACANCY_HEADERS,
+    ),
+    "keyword": (
+        _sql_report(KEYWORD_SQL, lambda kw: (f"%{kw}%",)),
+        ["Вакансия", "Компания"] + VACANCY_HEADERS,
+    ),
+    "avg_salary": (
+        lambda db, kw, limit: [(db.get_avg_salary(),)],
+        ["Средняя зарплата в RUB"],
+    ),
+    "percentiles": (
+        lambda db, kw, limit: [db.get_salary_percentiles()],
+        ["P10", "Медиана", "P90"],
+    ),
+    "histogram": (
+        lambda db, kw, limit: db.get_salary_histogram()[:limit],
+        ["Корзина", "От", "До", "Вакансий"],
+    ),
+    "by_employer": (
+        _sql_report(BY_EMPLOYER_SQL),
+        ["Компания", "С зарплатой", "P10", "Медиана", "P90", "Средняя"],
+    ),
+    "by_currency": (
+        _sql_report(BY_CURRENCY_SQL),
+        ["Валюта", "Вакансий", "Медиана в RUB", "Средняя в RUB"],
+    ),
+    "salary_trend": (
+        lambda db, kw, limit: db.get_salary_trend_by_employer(limit=limit),
+        ["Компания", "Неделя", "Вакансий", "Медиана в RUB"],
+    ),
+    "count_trend": (
+        lambda db, kw, limit: db.get_vacancy_count_trend(limit=limit),
+        ["Дата", "Вакансий", "Медиана в RUB"],
+    ),
+}
+
+
+def run_report(
+    name: str,
+    fmt: str = "table",
+    keyword: str | None = None,
+    limit: int | None = None,
+) -> int:
+    """Выводит один отчёт по уже загруженным данным и завершается.
+
+    Не создаёт базу, не обновляет курсы валют и не сверяет структуру таблиц:
+    открывает ровно одно соединение, проверяет отпечаток схемы и выполняет
+    запрос. Подходит для запуска из cron.
+
+    Args:
+        name (str): имя отчёта из `REPORTS`.
+        fmt (str): формат вывода — "table", "csv" или "json".
+        keyword (str | None): ключевое слово для отчёта "keyword" (обязательно).
+        limit (int | None): максимальное количество строк; для отчётов по
+            таблицам передаётся в SQL как LIMIT.
+
+    Returns:
+        int: код завершения процесса (0 — успех).
+    """
+    if name not in REPORTS:
+        print(
+            f"❌ Неизвестный отчёт '{name}', доступны: {', '.join(REPORTS)}",
+            file=sys.stderr,
+        )
+        return 2
+    if name == "keyword" and not keyword:
+        print("❌ Для отчёта 'keyword' укажите --keyword", file=sys.stderr)
+        return 2
+    query, headers = REPORTS[name]
+    with DBManager() as db:
+        with db.conn.cursor() as cur:
+            if not schema_is_current(cur):
+                print(
+                    "❌ Схема БД не совпадает с ожидаемой — "
+                    "сначала выполните полную загрузку (python main.py)",
+                    file=sys.stderr,
+                )
+                return 1
+        rows = query(db, keyword, limit)
+
+    if fmt == "json":
+        json.dump(
+            [dict(zip(headers, row)) for row in rows],
+            sys.stdout,
+            ensure_ascii=False,
+            default=lambda v: float(v) if isinstance(v, Decimal) else str(v),
+        )
+        print()
+    elif fmt == "csv":
+        writer = csv.writer(sys.stdout)
+        writer.writerow(headers)
+        writer.writerows(rows)
+    else:
+        # tabulate нужен только для табличного вывода
+        from tabulate import tabulate
+
+        print(tabulate(rows, headers=headers, tablefmt="simple"))
+    return 0
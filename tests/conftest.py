@@ -0,0 +1,50 @@
+import psycopg2
+import pytest
+
+from src import db_setup
+from src.config import load_config
+
+TEST_DB = "hh_db_test"
+
+
+def _connect(dbname: str):
+    """Подключается к базе с параметрами из .env."""
+    config = load_config()
+    return psycopg2.connect(
+        dbname=dbname,
+        user=config["user"],
+        password=config["password"],
+        host=config["host"],
+        port=config["port"],
+        connect_timeout=3,
+    )
+
+
+@pytest.fixture(scope="session")
+def pg_database():
+    """Создаёт отдельную базу hh_db_test; без PostgreSQL тесты пропускаются."""
+    try:
+        admin = _connect("postgres")
+    except psycopg2.OperationalError:
+        pytest.skip("PostgreSQL недоступен")
+    admin.autocommit = True
+    with admin.cursor() as cur:
+        cur.execute(f"DROP DATABASE IF EXISTS {TEST_DB} WITH (FORCE)")
+        cur.execute(f"CREATE DATABASE {TEST_DB} ENCODING 'UTF8' TEMPLATE template0")
+    yield TEST_DB
+    with admin.cursor() as cur:
+        cur.execute(f"DROP DATABASE IF EXISTS {TEST_DB} WITH (FORCE)")
+    admin.close()
+
+
+@pytest.fixture
+def pg_conn(pg_database, monkeypatch):
+    """Подключение к пустой hh_db_test; функции db_setup работают с ней же."""
+    monkeypatch.setattr(db_setup, "_connect", lambda dbname=None: _connect(TEST_DB))
+    conn = _connect(TEST_DB)
+    conn.autocommit = True
+    with conn.cursor() as cur:
+        cur.execute("DROP SCHEMA public CASCADE")
+        cur.execute("CREATE SCHEMA public")
+    yield conn
+    conn.close()
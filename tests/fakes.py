@@ -0,0 +1,57 @@
+from typing import Any
+
+
+class FakeCursor:
+    """Курсор psycopg2, который отдаёт заранее заданные строки."""
+
+    def __init__(self, conn: "FakeConnection", name: str | None = None) -> None:
+        self.conn = conn
+        self.name = name
+        self.itersize = 2000
+        self.rowcount = 0
+
+    def __enter__(self) -> "FakeCursor":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        pass
+
+    def execute(self, sql: str, params: Any = None) -> None:
+        self.conn.executed.append((self.name, sql, self.conn.autocommit))
+        self.conn.params.append(params)
+
+    def fetchone(self) -> tuple[Any, ...] | None:
+        return self.conn.rows.pop(0) if self.conn.rows else None
+
+    def fetchall(self) -> list[tuple[Any, ...]]:
+        rows, self.conn.rows = self.conn.rows, []
+        return rows
+
+    def fetchmany(self, size: int) -> list[tuple[Any, ...]]:
+        chunk, self.conn.rows = self.conn.rows[:size], self.conn.rows[size:]
+        return chunk
+
+    def mogrify(self, sql: str, params: tuple[str, ...]) -> bytes:
+        return (sql % tuple(f"'{p}'" for p in params)).encode()
+
+
+class FakeConnection:
+    """Соединение psycopg2 с журналом выполненных запросов и транзакций."""
+
+    def __init__(self, rows: list[tuple[Any, ...]] | None = None) -> None:
+        self.rows = rows or []
+        self.executed: list[tuple[str | None, str, bool]] = []
+        self.params: list[Any] = []
+        self.autocommit = True
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self, name: str | None = None, **kwargs: Any) -> FakeCursor:
+        assert "withhold" not in kwargs
+        return FakeCursor(self, name)
+
+    def commit(self) -> None:
+        self.commits += 1
+
+    def rollback(self) -> None:
+        self.rollbacks += 1
@@ -0,0 +1,272 @@
+import time
+
+import pytest
+import requests
+
+from src.api_hh import CircuitBreaker, CircuitOpenError, HeadHunterAPI, LatencyTracker
+
+
+@pytest.fixture
+def hh(monkeypatch):
+    api = HeadHunterAPI([])
+    # без реальных пауз между запросами
+    monkeypatch.setattr(api.rate_limiter, "min_interval", 0.0)
+    return api
+
+
+def test_get_vacancy_details_parses_fields(hh, monkeypatch):
+    responses = {
+        "1": {
+            "description": "<p>Python</p>",
+            "key_skills": [{"name": "Python"}, {"name": "SQL"}],
+            "experience": {"id": "between1And3"},
+            "schedule": {"id": "remote"},
+        },
+        # закрытая вакансия: _get вернул {} на 404
+        "2": {},
+        "3": {"description": None, "key_skills": None},
+    }
+    monkeypatch.setattr(
+        hh, "_get", lambda url, params=None: responses[url.rsplit("/", 1)[-1]]
+    )
+
+    details = hh.get_vacancy_details(["1", "2", "3"], max_workers=2)
+
+    assert details == {
+        "1": {
+            "description": "<p>Python</p>",
+            "key_skills": ["Python", "SQL"],
+            "experience": "between1And3",
+            "schedule": "remote",
+        },
+        "3": {
+            "description": None,
+            "key_skills": [],
+            "experience": None,
+            "schedule": None,
+        },
+    }
+
+
+def test_get_vacancy_details_skips_failed_requests(hh, monkeypatch):
+    def fake_get(url, params=None):
+        if url.endswith("/2"):
+            raise RuntimeError("❌ Не удалось получить данные")
+        return {"description": "ok"}
+
+    monkeypatch.setattr(hh, "_get", fake_get)
+
+    assert list(hh.get_vacancy_details(["1", "2"])) == ["1"]
+
+
+def test_vacancy_params_merge_filters_and_facet():
+    api = HeadHunterAPI([], filters={"text": "Python", "area": ["1", "2"]})
+    params = api._vacancy_params("42", {"area": "1"}, page=3)
+    assert params == {"employer_id": "42", "text": "Python", "area": "1", "page": 3}
+
+
+def _cluster_item(name: str, query: str, count: int) -> dict:
+    return {
+        "name": name,
+        "url": f"https://api.hh.ru/vacancies?employer_id=1&{query}",
+        "count": count,
+    }
+
+
+def _facet_crawl(hh, monkeypatch, items, slices):
+    """Запускает обход по срезам area; возвращает результат и вызовы обхода."""
+    calls = []
+
+    def fake_get_vacancies(employer_id, employer_name, found, facet=None):
+        calls.append(facet)
+        if facet is None:
+            return [{"id": f"t{i}"} for i in range(found)]
+        return [{"id": vac_id} for vac_id in slices[facet["area"]]]
+
+    monkeypatch.setattr(
+        hh,
+        "_get",
+        lambda url, params=None: {"clusters": [{"id": "area", "items": items}]},
+    )
+    monkeypatch.setattr(hh, "get_vacancies", fake_get_vacancies)
+    return hh.get_vacancies_by_facets("1", "Employer", 3000, "area"), calls
+
+
+def test_facets_accept_small_shortfall(hh, monkeypatch):
+    items = [
+        _cluster_item("Москва", "area=1", 1500),
+        _cluster_item("СПб", "area=2", 1500),
+    ]
+    # одна вакансия попала в оба среза: объединение на 1 меньше found
+    slices = {
+        "1": [str(i) for i in range(1500)],
+        "2": [str(i) for i in range(1499, 2999)],
+    }
+
+    vacancies, calls = _facet_crawl(hh, monkeypatch, items, slices)
+
+    assert len(vacancies) == 2999
+    assert calls == [{"area": "1"}, {"area": "2"}]
+
+
+def test_facets_fall_back_when_clusters_are_incomplete(hh, monkeypatch):
+    items = [_cluster_item("Москва", "area=1", 2000)]
+    slices = {"1": [str(i) for i in range(2000)]}
+
+    vacancies, calls = _facet_crawl(hh, monkeypatch, items, slices)
+
+    assert calls == [{"area": "1"}, None]
+    assert len(vacancies) == 5000
+
+
+def test_facets_take_new_value_from_cluster_url(hh, monkeypatch):
+    hh.filters = {"area": ["1", "2"]}
+    items = [
+        _cluster_item("Москва", "area=1&area=2&area=3", 1500),
+        _cluster_item("СПб", "area=1", 1500),
+    ]
+    slices = {"3": ["a"], "1": ["b"]}
+
+    _, calls = _facet_crawl(hh, monkeypatch, items, slices)
+
+    assert calls == [{"area": "3"}, {"area": "1"}]
+
+
+class FakeResponse:
+    def __init__(self, status_code: int = 200, payload: dict | None = None) -> None:
+        self.status_code = status_code
+        self.ok = status_code < 400
+        self._payload = payload or {}
+
+    def json(self) -> dict:
+        return self._payload
+
+    def raise_for_status(self) -> None:
+        pass
+
+
+def test_latency_p95_needs_enough_samples():
+    tracker = LatencyTracker(window=100, min_samples=5)
+    for value in (0.1, 0.2, 0.3, 0.4):
+        tracker.record(value)
+    assert tracker.p95() is None
+    for i in range(96):
+        tracker.record(i / 100)
+    assert tracker.p95() == pytest.approx(0.9)
+
+
+def test_breaker_opens_and_lets_one_trial_through():
+    breaker = CircuitBreaker(threshold=0.5, window=4, cooldown=0.05)
+    for ok in (True, False, True, False):
+        breaker.record(ok)
+    assert not breaker.allow()
+    assert 0 < breaker.retry_after() <= 0.05
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    # пока идёт пробный запрос, остальные отклоняются
+    assert not breaker.allow()
+    assert breaker.retry_after(poll=0.5) == 0.5
+
+    breaker.record(False)
+    assert not breaker.allow()
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record(True)
+    assert breaker.allow() and breaker.allow()
+
+
+def test_send_hedges_slow_request(hh, monkeypatch):
+    for _ in range(20):
+        hh.latency.record(0.05)
+    calls = []
+
+    def fake_timed_get(url, params):
+        calls.append(url)
+        if len(calls) == 1:
+            time.sleep(0.5)
+            return FakeResponse(payload={"from": "slow"})
+        return FakeResponse(payload={"from": "hedge"})
+
+    monkeypatch.setattr(hh, "_timed_get", fake_timed_get)
+
+    assert hh._send("u", None).json() == {"from": "hedge"}
+    assert len(calls) == 2
+
+
+def test_send_raises_when_all_copies_fail(hh, monkeypatch):
+    for _ in range(20):
+        hh.latency.record(0.01)
+
+    def failing(url, params):
+        time.sleep(0.05)
+        raise requests.ConnectionError("boom")
+
+    monkeypatch.setattr(hh, "_timed_get", failing)
+
+    with pytest.raises(requests.ConnectionError):
+        hh._send("u", None)
+
+
+def test_get_waits_for_circuit_to_close(hh, monkeypatch):
+    hh.breaker = CircuitBreaker(window=1, cooldown=0.05)
+    hh.breaker.record(False)
+    monkeypatch.setattr(hh, "_send", lambda url, params: FakeResponse(payload={"a": 1}))
+
+    assert hh._get("u") == {"a": 1}
+
+
+def test_get_gives_up_after_max_circuit_wait(hh, monkeypatch):
+    hh.breaker = CircuitBreaker(window=1, cooldown=60)
+    hh.breaker.record(False)
+    hh.max_circuit_wait = 0.1
+
+    with pytest.raises(CircuitOpenError):
+        hh._get("u")
+
+
+def test_get_fails_fast_after_giving_up(hh, monkeypatch):
+    hh.breaker = CircuitBreaker(window=1, cooldown=60)
+    hh.breaker.record(False)
+    hh.max_circuit_wait = 0.1
+    with pytest.raises(CircuitOpenError):
+        hh._get("u")
+
+    # следующий вызов не ждёт свой `max_circuit_wait` заново
+    hh.max_circuit_wait = 1000.0
+    sleeps = []
+    monkeypatch.setattr(time, "sleep", sleeps.append)
+    with pytest.raises(CircuitOpenError):
+        hh._get("u")
+    assert sleeps == []
+
+    # успешный ответ снимает признак
+    hh.breaker = CircuitBreaker(window=1, cooldown=60)
+    monkeypatch.setattr(hh, "_send", lambda url, params: FakeResponse(payload={}))
+    hh._get("u")
+    assert not hh._circuit_gave_up.is_set()
+
+
+def test_collect_data_stops_when_circuit_stays_open(hh, monkeypatch):
+    hh.employers = ["1", "2", "3"]
+    requested = []
+
+    def fake_get_employer(employer_id):
+        requested.append(employer_id)
+        if employer_id == "2":
+            raise CircuitOpenError("⛔ API недоступен")
+        return {"id": employer_id, "name": "E", "alternate_url": "u"}
+
+    monkeypatch.setattr(hh, "get_employer", fake_get_employer)
+    monkeypatch.setattr(hh, "_get", lambda url, params=None: {"found": 1})
+    monkeypatch.setattr(
+        hh,
+        "get_vacancies",
+        lambda *args, **kwargs: [{"id": "v", "name": "V", "alternate_url": "u"}],
+    )
+
+    data = hh.collect_data()
+
+    assert requested == ["1", "2"]
+    assert [emp["employer_id"] for emp in data["employers"]] == ["1"]
+    assert [vac["vacancy_id"] for vac in data["vacancies"]] == ["v"]
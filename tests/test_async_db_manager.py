@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+from src.db_manager import DBManager
+from src.db_setup import create_tables
+
+pytest.importorskip("asyncpg")
+
+from src.async_db_manager import AsyncDBManager, _numbered  # noqa: E402
+
+
+def test_numbered_replaces_placeholders_in_order():
+    assert _numbered("a = %s AND b < (%s::numeric, %s)") == (
+        "a = $1 AND b < ($2::numeric, $3)"
+    )
+
+
+def _data() -> dict:
+    return {
+        "employers": [
+            {"employer_id": str(e), "name": f"E{e}", "url": "u", "open_vacancies": 1}
+            for e in range(2)
+        ],
+        "vacancies": [
+            {
+                "vacancy_id": str(i),
+                "employer_id": str(i % 2),
+                "name": "Python developer" if i % 3 else "Java developer",
+                "salary_from": 1000 * (i + 1) if i != 4 else None,
+                "salary_to": None,
+                "salary_currency": "RUR",
+                "url": "u",
+            }
+            for i in range(8)
+        ],
+    }
+
+
+async def _async_results(database: str, after: tuple[str, str]) -> list:
+    async with AsyncDBManager(max_size=2, database=database) as db:
+        return [
+            await db.get_companies_and_vacancies_count(),
+            await db.get_vacancies_with_keyword("python"),
+            await db.get_salary_histogram(buckets=3, low=2000),
+            await db.get_salary_stats_by_employer(),
+            await db.get_salary_stats_by_currency(),
+            await db.get_vacancies_page(keyword="dev", after=after, limit=3),
+            await db.get_vacancies_page(higher_salary=True),
+        ]
+
+
+def test_results_match_dbmanager(pg_conn, pg_database):
+    create_tables()
+    db = DBManager(conn=pg_conn)
+    db.insert_data(_data())
+    first_page = db.get_vacancies_page(keyword="dev", limit=3)
+    after = (str(first_page[-1][-1]), first_page[-1][0])
+
+    expected = [
+        db.get_companies_and_vacancies_count(),
+        db.get_vacancies_with_keyword("python"),
+        db.get_salary_histogram(buckets=3, low=2000),
+        db.get_salary_stats_by_employer(),
+        db.get_salary_stats_by_currency(),
+        db.get_vacancies_page(keyword="dev", after=after, limit=3),
+        db.get_vacancies_page(higher_salary=True),
+    ]
+
+    assert asyncio.run(_async_results(pg_database, after)) == expected
@@ -0,0 +1,85 @@
+import pytest
+
+from src import config
+
+HH_VARIABLES = [
+    "HH_TEXT",
+    "HH_SALARY",
+    "HH_EXPERIENCE",
+    "HH_AREA",
+    "HH_PROFESSIONAL_ROLE",
+    "HH_ONLY_WITH_SALARY",
+    "LOAD_MODE",
+    "HH_PARTITION",
+    "SNAPSHOTS",
+    "SNAPSHOT_RETENTION_MONTHS",
+]
+
+
+@pytest.fixture(autouse=True)
+def clean_env(monkeypatch):
+    # .env разработчика не должен влиять на тесты
+    monkeypatch.setattr(config, "load_dotenv", lambda: None)
+    for name in HH_VARIABLES:
+        monkeypatch.delenv(name, raising=False)
+
+
+def test_search_filters_empty_by_default():
+    assert config.load_search_filters() == {}
+
+
+def test_search_filters_split_multi_values(monkeypatch):
+    monkeypatch.setenv("HH_TEXT", "Python")
+    monkeypatch.setenv("HH_AREA", "1, 2,,")
+    monkeypatch.setenv("HH_PROFESSIONAL_ROLE", "96")
+    monkeypatch.setenv("HH_ONLY_WITH_SALARY", "yes")
+    monkeypatch.setenv("HH_SALARY", "")
+
+    assert config.load_search_filters() == {
+        "text": "Python",
+        "area": ["1", "2"],
+        "professional_role": ["96"],
+        "only_with_salary": "true",
+    }
+
+
+def test_search_filters_ignore_false_flag(monkeypatch):
+    monkeypatch.setenv("HH_ONLY_WITH_SALARY", "0")
+    assert "only_with_salary" not in config.load_search_filters()
+
+
+def test_settings_snapshot_defaults():
+    settings = config.load_settings()
+    assert settings["snapshots"] is False
+    assert settings["snapshot_retention_months"] == 12
+
+
+def test_settings_snapshot_overrides(monkeypatch):
+    monkeypatch.setenv("SNAPSHOTS", "1")
+    monkeypatch.setenv("SNAPSHOT_RETENTION_MONTHS", "3")
+    settings = config.load_settings()
+    assert settings["snapshots"] is True
+    assert settings["snapshot_retention_months"] == 3
+
+
+@pytest.mark.parametrize("mode", ["reset", "reload", "merge"])
+def test_settings_accept_load_modes(monkeypatch, mode):
+    monkeypatch.setenv("LOAD_MODE", mode)
+    assert config.load_settings()["load_mode"] == mode
+
+
+@pytest.mark.parametrize(
+    "name, value",
+    [("LOAD_MODE", "merged"), ("LOAD_MODE", "RESET"), ("HH_PARTITION", "day")],
+)
+def test_settings_reject_unknown_values(monkeypatch, name, value):
+    monkeypatch.setenv(name, value)
+    with pytest.raises(ValueError, match=name):
+        config.load_settings()
+
+
+@pytest.mark.parametrize("months", ["0", "-3"])
+def test_settings_reject_empty_snapshot_retention(monkeypatch, months):
+    monkeypatch.setenv("SNAPSHOT_RETENTION_MONTHS", months)
+    with pytest.raises(ValueError, match="SNAPSHOT_RETENTION_MONTHS"):
+        config.load_settings()
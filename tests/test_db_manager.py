@@ -0,0 +1,258 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+
+from src import db_manager
+from src.db_manager import (
+    DBManager,
+    _numeric_2,
+    _salary_rub,
+    vacancy_hash,
+    with_limit,
+)
+from src.db_setup import create_snapshot_table, create_tables
+from tests.fakes import FakeConnection, FakeCursor
+
+
+def _vacancy(**fields) -> dict:
+    vacancy = {
+        "vacancy_id": "1",
+        "employer_id": "10",
+        "name": "Python developer",
+        "salary_from": 1000,
+        "salary_to": 2000,
+        "salary_currency": "USD",
+        "url": "https://hh.ru/vacancy/1",
+    }
+    vacancy.update(fields)
+    return vacancy
+
+
+def test_export_sql_rejects_unknown_dataset():
+    db = DBManager(conn=FakeConnection())
+    with pytest.raises(ValueError, match="Неизвестный набор"):
+        db._export_sql(FakeCursor(db.conn), "unknown", None)
+
+
+def test_export_sql_requires_keyword():
+    db = DBManager(conn=FakeConnection())
+    with pytest.raises(ValueError, match="ключевое слово"):
+        db._export_sql(FakeCursor(db.conn), "keyword", None)
+
+
+def test_export_sql_inlines_keyword():
+    db = DBManager(conn=FakeConnection())
+    sql = db._export_sql(FakeCursor(db.conn), "keyword", "Python")
+    assert "ILIKE '%Python%'" in sql
+
+
+def test_export_to_parquet_streams_inside_transaction(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    rows = [(f"Компания {i}", i, i * 1000) for i in range(5)]
+    conn = FakeConnection(rows)
+    db = DBManager(conn=conn)
+
+    total = db.export_to_parquet(
+        "companies", str(tmp_path / "out.parquet"), chunk_size=2
+    )
+
+    assert total == 5
+    # выборка идёт именованным курсором внутри транзакции, а не в autocommit
+    assert [(name, autocommit) for name, _, autocommit in conn.executed] == [
+        ("export_companies", False)
+    ]
+    assert conn.commits == 1
+    assert conn.autocommit is True
+
+    table = pq.read_table(tmp_path / "out.parquet")
+    assert table.column_names == ["company", "vacancies_count", "avg_salary_rub"]
+    salaries = table.column("avg_salary_rub").to_pylist()
+    assert salaries == [i * 1000.0 for i in range(5)]
+
+
+def test_export_to_parquet_rolls_back_on_error(tmp_path):
+    pytest.importorskip("pyarrow")
+    conn = FakeConnection([("Компания", "не число", None)])
+    db = DBManager(conn=conn)
+
+    with pytest.raises(Exception):
+        db.export_to_parquet("companies", str(tmp_path / "out.parquet"))
+
+    assert conn.rollbacks == 1
+    assert conn.autocommit is True
+
+
+def test_salary_percentiles_unpacks_array():
+    db = DBManager(conn=FakeConnection([([100.0, 200.0, 300.0],)]))
+    assert db.get_salary_percentiles() == (100.0, 200.0, 300.0)
+
+
+def test_salary_percentiles_without_salaries():
+    db = DBManager(conn=FakeConnection([(None,)]))
+    assert db.get_salary_percentiles() == (None, None, None)
+
+
+def test_salary_histogram_passes_bounds():
+    db = DBManager(conn=FakeConnection())
+    db.get_salary_histogram(buckets=5, low=1000)
+    assert db.conn.params[-1] == {"low": 1000, "high": None, "buckets": 5}
+
+
+def test_with_limit_appends_limit_parameter():
+    assert with_limit("SELECT 1", (), None) == ("SELECT 1", None)
+    assert with_limit("SELECT %s\n", ("a",), None) == ("SELECT %s\n", ("a",))
+    assert with_limit("SELECT %s\n", ("a",), 5) == (
+        "SELECT %s\n    LIMIT %s",
+        ("a", 5),
+    )
+
+
+def test_vacancy_hash_tracks_content_only():
+    base = vacancy_hash(_vacancy())
+    assert base == vacancy_hash(_vacancy())
+    assert base != vacancy_hash(_vacancy(salary_to=2500))
+    assert base != vacancy_hash(_vacancy(name="Senior Python developer"))
+    # id вакансии не входит в содержимое
+    assert base == vacancy_hash(_vacancy(vacancy_id="2"))
+
+
+@pytest.mark.parametrize(
+    "salary_from, salary_to, expected",
+    [(1000, 2000, 150000.0), (1000, None, 100000.0), (None, 3000, 300000.0)],
+)
+def test_salary_rub_uses_midpoint_and_rate(salary_from, salary_to, expected):
+    vac = _vacancy(salary_from=salary_from, salary_to=salary_to)
+    assert _salary_rub(vac, {"USD": 0.01}) == pytest.approx(expected)
+
+
+def test_salary_rub_without_salary():
+    assert _salary_rub(_vacancy(salary_from=None, salary_to=None), {}) is None
+
+
+def test_numeric_2_rounds_half_up():
+    assert _numeric_2(None) is None
+    assert _numeric_2(0.125) == Decimal("0.13")
+    assert _numeric_2(1 / 3) == Decimal("0.33")
+
+
+def _merge(db: DBManager, vacancies: list[dict]) -> dict[str, int]:
+    employer = {"employer_id": "10", "name": "E", "url": "u", "open_vacancies": 1}
+    return db.merge_data({"employers": [employer], "vacancies": vacancies})
+
+
+def test_merge_rewrites_salary_after_rate_change(pg_conn):
+    create_tables()
+    db = DBManager(conn=pg_conn)
+    with pg_conn.cursor() as cur:
+        cur.execute("INSERT INTO currency_rates VALUES ('USD', 0.011)")
+    vacancies = [_vacancy(), _vacancy(vacancy_id="2", salary_currency="RUR")]
+
+    assert _merge(db, vacancies)["written"] == 2
+    assert _merge(db, vacancies) == {"written": 0, "unchanged": 2, "archived": 0}
+
+    with pg_conn.cursor() as cur:
+        cur.execute("UPDATE currency_rates SET rate = 0.0125 WHERE code = 'USD'")
+    assert _merge(db, vacancies) == {"written": 1, "unchanged": 1, "archived": 0}
+    with pg_conn.cursor() as cur:
+        cur.execute("SELECT salary_rub FROM vacancies WHERE vacancy_id = '1'")
+        assert cur.fetchone()[0] == Decimal("120000.00")
+
+
+def test_merge_keeps_last_duplicate_vacancy(pg_conn):
+    create_tables()
+    db = DBManager(conn=pg_conn)
+    vacancies = [_vacancy(), _vacancy(vacancy_id="2"), _vacancy(name="Senior")]
+
+    assert _merge(db, vacancies) == {"written": 2, "unchanged": 0, "archived": 0}
+    with pg_conn.cursor() as cur:
+        cur.execute("SELECT name FROM vacancies WHERE vacancy_id = '1'")
+        assert cur.fetchone()[0] == "Senior"
+
+
+def test_merge_rolls_back_on_error(pg_conn):
+    create_tables()
+    db = DBManager(conn=pg_conn)
+
+    with pytest.raises(Exception):
+        _merge(db, [_vacancy(), _vacancy(vacancy_id="2", employer_id="missing")])
+
+    with pg_conn.cursor() as cur:
+        cur.execute("SELECT COUNT(*) FROM employers")
+        assert cur.fetchone()[0] == 0
+    assert pg_conn.get_transaction_status() == TRANSACTION_STATUS_IDLE
+
+
+def test_details_cache_follows_content_hash(pg_conn):
+    create_tables()
+    db = DBManager(conn=pg_conn)
+    _merge(db, [_vacancy(), _vacancy(vacancy_id="2")])
+
+    pending = dict(db.get_vacancies_without_details())
+    assert sorted(pending) == ["1", "2"]
+    details = {"description": "d", "key_skills": [], "experience": None}
+    db.save_vacancy_details(
+        {vac_id: {**details, "schedule": None} for vac_id in pending}, pending
+    )
+    assert db.get_vacancies_without_details() == []
+
+    # изменилось содержимое — подробности нужно загрузить заново
+    _merge(db, [_vacancy(name="Senior Python"), _vacancy(vacancy_id="2")])
+    assert [vac_id for vac_id, _ in db.get_vacancies_without_details()] == ["1"]
+
+
+def _today(monkeypatch, today: date) -> None:
+    class FixedDate(date):
+        @classmethod
+        def today(cls) -> date:
+            return today
+
+    monkeypatch.setattr(db_manager, "date", FixedDate)
+
+
+@pytest.mark.parametrize(
+    "today, keep_months, dropped",
+    [
+        (date(2024, 3, 15), 3, ["2023m11", "2023m12"]),
+        (date(2024, 1, 31), 2, ["2023m11"]),
+        (date(2024, 1, 1), 1, ["2023m11", "2023m12"]),
+        (date(2024, 12, 1), 12, ["2023m11", "2023m12"]),
+        (date(2025, 1, 10), 12, ["2023m11", "2023m12", "2024m01"]),
+        # без проверки отсечка ушла бы в будущее и удалила бы все секции
+        (date(2024, 3, 15), 0, None),
+        (date(2024, 3, 15), -1, None),
+    ],
+)
+def test_drop_old_snapshots_cutoff(monkeypatch, today, keep_months, dropped):
+    _today(monkeypatch, today)
+    months = ["2023m11", "2023m12", "2024m01", "2024m02", "2024m03", "2024m12"]
+    conn = FakeConnection([(f"vacancy_snapshots_y{month}",) for month in months])
+    if dropped is None:
+        with pytest.raises(ValueError, match="хотя бы один месяц"):
+            DBManager(conn=conn).drop_old_snapshots(keep_months)
+        assert conn.executed == []
+        return
+
+    names = [f"vacancy_snapshots_y{month}" for month in dropped]
+    assert DBManager(conn=conn).drop_old_snapshots(keep_months) == names
+    assert [sql for _, sql, _ in conn.executed[1:]] == [
+        f"DROP TABLE {name}" for name in names
+    ]
+
+
+def test_snapshot_partitions_are_dropped_by_month(pg_conn, monkeypatch):
+    create_tables()
+    create_snapshot_table()
+    db = DBManager(conn=pg_conn)
+    _merge(db, [_vacancy()])
+    for day in [date(2023, 12, 31), date(2024, 1, 15), date(2024, 2, 1)]:
+        assert db.take_snapshot(day) == 1
+    # повторный снимок за ту же дату заменяет предыдущий
+    assert db.take_snapshot(date(2024, 2, 1)) == 1
+
+    _today(monkeypatch, date(2024, 2, 20))
+    assert db.drop_old_snapshots(2) == ["vacancy_snapshots_y2023m12"]
+    with pg_conn.cursor() as cur:
+        cur.execute("SELECT snapshot_date FROM vacancy_snapshots ORDER BY 1")
+        assert cur.fetchall() == [(date(2024, 1, 15),), (date(2024, 2, 1),)]
@@ -0,0 +1,83 @@
+import pytest
+
+from src.db_manager import DBManager, _copy_value
+from src.db_setup import create_staging_tables, create_tables, swap_staging_tables
+
+
+def _data(names: list[str]) -> dict:
+    return {
+        "employers": [
+            {"employer_id": str(e), "name": f"E{e}", "url": "u", "open_vacancies": 1}
+            for e in range(3)
+        ],
+        "vacancies": [
+            {
+                "vacancy_id": str(i),
+                "employer_id": str(i % 3),
+                "name": name,
+                "salary_from": 1000 * (i + 1),
+                "salary_to": None,
+                "salary_currency": "RUR",
+                "url": "u",
+            }
+            for i, name in enumerate(names)
+        ],
+    }
+
+
+def test_copy_value_escapes_text_format():
+    assert _copy_value(None) == "\\N"
+    assert _copy_value("a\tb\nc\\d\r") == "a\\tb\\nc\\\\d\\r"
+    assert _copy_value(12.5) == "12.5"
+
+
+def _fetch(conn, query: str) -> list[tuple]:
+    with conn.cursor() as cur:
+        cur.execute(query)
+        return cur.fetchall()
+
+
+@pytest.mark.parametrize("partitions", [0, 4])
+def test_reload_through_staging(pg_conn, partitions):
+    create_tables(reset=False, partitions=partitions)
+    db = DBManager(conn=pg_conn)
+    names = ["Python\tdev", "", "C:\\путь\nвторая строка", "Java"]
+
+    for run in range(2):
+        create_staging_tables(partitions)
+        data = _data(names[: 3 + run])
+        # повтор вакансии в выдаче не ломает COPY
+        data["vacancies"].append(dict(data["vacancies"][0]))
+        db.insert_data(data, staging=True)
+        swap_staging_tables()
+
+        rows = _fetch(pg_conn, "SELECT name FROM vacancies ORDER BY vacancy_id")
+        assert [name for (name,) in rows] == names[: 3 + run]
+
+    assert _fetch(
+        pg_conn,
+        "SELECT conname FROM pg_constraint "
+        "WHERE contype = 'f' AND conrelid = 'vacancies'::regclass",
+    ) == [("vacancies_employer_id_fkey",)]
+    leftovers = _fetch(
+        pg_conn, "SELECT relname FROM pg_class WHERE relname LIKE '%staging%'"
+    )
+    assert leftovers == []
+    partition_names = _fetch(
+        pg_conn,
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = 'vacancies'::regclass ORDER BY 1",
+    )
+    assert partition_names == [(f"vacancies_p{n}",) for n in range(partitions)]
+
+
+def test_insert_data_rolls_back_on_error(pg_conn):
+    create_tables()
+    db = DBManager(conn=pg_conn)
+    data = _data(["Python"])
+    data["vacancies"][0]["employer_id"] = "missing"
+
+    with pytest.raises(Exception):
+        db.insert_data(data)
+
+    assert _fetch(pg_conn, "SELECT count(*) FROM employers") == [(0,)]
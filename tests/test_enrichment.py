@@ -0,0 +1,77 @@
+from src import enrichment
+from src.api_hh import CircuitOpenError
+
+
+class FakeDB:
+    def __init__(self, pending):
+        self.pending = pending
+        self.saved = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def get_vacancies_without_details(self):
+        return self.pending
+
+    def save_vacancy_details(self, details, hashes):
+        self.saved.append((dict(details), dict(hashes)))
+
+
+class FakeHH:
+    def __init__(self):
+        self.requested = []
+
+    def get_vacancy_details(self, vacancy_ids, max_workers=8):
+        self.requested.append(list(vacancy_ids))
+        return {vacancy_id: {"description": vacancy_id} for vacancy_id in vacancy_ids}
+
+
+def test_enrich_saves_each_batch_with_hashes(monkeypatch):
+    db = FakeDB([(str(i), f"hash{i}") for i in range(5)])
+    monkeypatch.setattr(enrichment, "DBManager", lambda: db)
+    hh = FakeHH()
+
+    enrichment.enrich_vacancies(hh, batch_size=2)
+
+    assert hh.requested == [["0", "1"], ["2", "3"], ["4"]]
+    assert [hashes for _, hashes in db.saved] == [
+        {"0": "hash0", "1": "hash1"},
+        {"2": "hash2", "3": "hash3"},
+        {"4": "hash4"},
+    ]
+
+
+def test_enrich_skips_when_nothing_pending(monkeypatch, capsys):
+    db = FakeDB([])
+    monkeypatch.setattr(enrichment, "DBManager", lambda: db)
+    hh = FakeHH()
+
+    enrichment.enrich_vacancies(hh)
+
+    assert hh.requested == []
+    assert "уже загружены" in capsys.readouterr().out
+
+
+def test_enrich_stops_after_open_circuit(monkeypatch):
+    db = FakeDB([(str(i), f"hash{i}") for i in range(6)])
+    monkeypatch.setattr(enrichment, "DBManager", lambda: db)
+    hh = FakeHH()
+    original = hh.get_vacancy_details
+    calls = []
+
+    def flaky(vacancy_ids, max_workers=8):
+        calls.append(list(vacancy_ids))
+        if "2" in vacancy_ids:
+            raise CircuitOpenError("⛔ API недоступен")
+        return original(vacancy_ids, max_workers)
+
+    hh.get_vacancy_details = flaky
+
+    enrichment.enrich_vacancies(hh, batch_size=2)
+
+    assert [sorted(hashes) for _, hashes in db.saved] == [["0", "1"]]
+    # после разомкнутой цепи следующие порции не запрашиваются
+    assert calls == [["0", "1"], ["2", "3"]]
@@ -0,0 +1,110 @@
+from decimal import Decimal
+
+import pytest
+
+from src.db_manager import DBManager
+from src.db_setup import create_tables
+
+pytest.importorskip("numpy")
+
+from src.memory_backend import InMemoryDBManager, _numeric_avg  # noqa: E402
+
+EMPLOYERS = [
+    {"employer_id": "1", "name": "Альфа", "url": "u1", "open_vacancies": 3},
+    {"employer_id": "2", "name": "Бета", "url": "u2", "open_vacancies": 2},
+    {"employer_id": "3", "name": "Гамма", "url": "u3", "open_vacancies": 0},
+]
+VACANCIES = [
+    ("10", "1", "Python developer", 100000, 150000, "RUR", "125000.00"),
+    ("11", "1", "Java developer", 90000, None, "RUR", "90000.00"),
+    ("12", "1", "Тестировщик", None, None, None, None),
+    ("20", "2", "Senior Python", 3000, 4000, "USD", "315000.33"),
+    ("21", "2", "Аналитик", 70001, None, "RUR", "70001.00"),
+]
+
+
+def _memory_db() -> InMemoryDBManager:
+    return InMemoryDBManager(
+        [(e["employer_id"], e["name"]) for e in EMPLOYERS],
+        [
+            (vac_id, emp_id, name, s_from, s_to, cur, rub and Decimal(rub), "url")
+            for vac_id, emp_id, name, s_from, s_to, cur, rub in VACANCIES
+        ],
+    )
+
+
+@pytest.mark.parametrize(
+    "total, count, expected",
+    [
+        # значения получены запросом SELECT AVG(...) в PostgreSQL
+        ("400.00", 3, "133.3333333333333333"),
+        ("0.05", 3, "0.01666666666666666667"),
+        ("123456789020.35", 3, "41152263006.78333333"),
+        ("50000.00", 1, "50000.000000000000"),
+    ],
+)
+def test_numeric_avg_matches_postgres_scale(total, count, expected):
+    result = _numeric_avg(Decimal(total), count)
+    assert str(result) == expected
+
+
+def test_avg_salary_is_decimal():
+    avg = _memory_db().get_avg_salary()
+    assert isinstance(avg, Decimal)
+    assert avg == Decimal("150000.3325")
+
+
+def test_higher_salary_and_keyword():
+    db = _memory_db()
+    assert [row[0] for row in db.get_vacancies_with_higher_salary()] == [
+        "Senior Python"
+    ]
+    assert [row[0] for row in db.get_vacancies_with_keyword("python")] == [
+        "Senior Python",
+        "Python developer",
+    ]
+
+
+def test_companies_without_vacancies_come_first():
+    companies = _memory_db().get_companies_and_vacancies_count()
+    assert companies == [
+        ("Гамма", 0, None),
+        ("Бета", 2, Decimal("192500.67")),
+        ("Альфа", 3, Decimal("107500.00")),
+    ]
+
+
+def test_parity_with_db_manager(pg_conn):
+    create_tables()
+    with pg_conn.cursor() as cur:
+        cur.execute("INSERT INTO currency_rates VALUES ('USD', 0.011111)")
+    db = DBManager(conn=pg_conn)
+    db.insert_data(
+        {
+            "employers": EMPLOYERS,
+            "vacancies": [
+                {
+                    "vacancy_id": vac_id,
+                    "employer_id": emp_id,
+                    "name": name,
+                    "salary_from": s_from,
+                    "salary_to": s_to,
+                    "salary_currency": cur,
+                    "url": "url",
+                }
+                for vac_id, emp_id, name, s_from, s_to, cur, _ in VACANCIES
+            ],
+        }
+    )
+    memory = InMemoryDBManager.from_db(db)
+
+    assert memory.get_avg_salary() == db.get_avg_salary()
+    for method in (
+        "get_companies_and_vacancies_count",
+        "get_all_vacancies",
+        "get_vacancies_with_higher_salary",
+    ):
+        assert getattr(memory, method)() == getattr(db, method)(), method
+    assert memory.get_vacancies_with_keyword("python") == (
+        db.get_vacancies_with_keyword("python")
+    )
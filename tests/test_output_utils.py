@@ -0,0 +1,25 @@
+from src.output_utils import print_salary_histogram, print_salary_percentiles
+
+
+def test_print_salary_percentiles(capsys):
+    print_salary_percentiles((50000.0, 120000.0, 300000.0))
+    out = capsys.readouterr().out
+    assert "P10: 50 000 руб." in out
+    assert "Медиана: 120 000 руб." in out
+    assert "P90: 300 000 руб." in out
+
+
+def test_print_salary_percentiles_without_data(capsys):
+    print_salary_percentiles((None, None, None))
+    assert "Нет данных для расчета." in capsys.readouterr().out
+
+
+def test_print_salary_histogram_scales_bars(capsys):
+    print_salary_histogram([(1, 0, 100, 4), (2, 100, 200, 2), (3, 200, 300, 0)], 8)
+    lines = capsys.readouterr().out.splitlines()[2:]
+    assert [line.count("█") for line in lines] == [8, 4, 0]
+
+
+def test_print_salary_histogram_empty(capsys):
+    print_salary_histogram([])
+    assert "Нет данных." in capsys.readouterr().out
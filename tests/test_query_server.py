@@ -0,0 +1,217 @@
+import io
+import threading
+import time
+from types import SimpleNamespace
+
+import psycopg2
+import pytest
+from psycopg2.pool import PoolError
+
+from src.config import load_config
+from src.db_manager import DATA_LOADED_CHANNEL
+from src.query_server import (
+    ROUTES,
+    QueryHandler,
+    QueryServer,
+    ResponseCache,
+    _bounded,
+    _vacancies_page,
+)
+from tests.fakes import FakeConnection
+
+
+def test_cache_evicts_least_recently_used():
+    cache = ResponseCache(maxsize=2)
+    cache.put("a", b"1")
+    cache.put("b", b"2")
+    assert cache.get("a") == b"1"
+    cache.put("c", b"3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1"
+    assert cache.get("c") == b"3"
+
+
+def test_cache_skips_response_from_previous_generation():
+    cache = ResponseCache()
+    generation = cache.generation
+    cache.clear()
+
+    cache.put("a", b"stale", generation)
+    assert cache.get("a") is None
+    cache.put("a", b"fresh", cache.generation)
+    assert cache.get("a") == b"fresh"
+
+
+class _PageDB:
+    def __init__(self, rows: list[tuple]) -> None:
+        self.rows = rows
+        self.calls: list[dict] = []
+
+    def get_vacancies_page(self, **kwargs) -> list[tuple]:
+        self.calls.append(kwargs)
+        return self.rows[: kwargs["limit"]]
+
+
+@pytest.mark.parametrize("limit", ["0", "-5"])
+def test_vacancies_page_rejects_non_positive_limit(limit):
+    with pytest.raises(ValueError, match="limit"):
+        _vacancies_page(_PageDB([]), {"limit": limit})
+
+
+def test_vacancies_page_builds_next_cursor():
+    rows = [(str(i), "v", "c", None, None, None, None, "u", 100 - i) for i in range(3)]
+    db = _PageDB(rows)
+
+    page = _vacancies_page(db, {"limit": "2", "cursor": "150.00|7"})
+
+    assert db.calls[0]["after"] == ("150.00", "7")
+    assert page["next_cursor"] == "99|1"
+    assert [item["vacancy_id"] for item in page["items"]] == ["0", "1"]
+    assert _vacancies_page(db, {"limit": "5"})["next_cursor"] is None
+
+
+def test_bounded_clamps_parameter():
+    # без параметра остаётся значение по умолчанию метода DBManager
+    assert _bounded({}, "buckets", 100) == {}
+    assert _bounded({"buckets": "20"}, "buckets", 100) == {"buckets": 20}
+    assert _bounded({"buckets": "100000000"}, "buckets", 100) == {"buckets": 100}
+
+
+@pytest.mark.parametrize("value", ["0", "-1", "x"])
+def test_bounded_rejects_bad_values(value):
+    with pytest.raises(ValueError):
+        _bounded({"weeks": value}, "weeks", 104)
+
+
+class _OnePool:
+    """Пул на одно соединение, который, как ThreadedConnectionPool, не ждёт."""
+
+    def __init__(self) -> None:
+        self.busy = False
+
+    def getconn(self):
+        if self.busy:
+            raise PoolError("connection pool exhausted")
+        self.busy = True
+        return FakeConnection()
+
+    def putconn(self, conn) -> None:
+        self.busy = False
+
+
+def test_query_waits_for_free_connection(monkeypatch):
+    server = QueryServer.__new__(QueryServer)
+    server.pool = _OnePool()
+    server._slots = threading.BoundedSemaphore(1)
+
+    def slow(db, query):
+        time.sleep(0.02)
+        return {"ok": True}
+
+    monkeypatch.setitem(ROUTES, "/slow", slow)
+    results: list[bytes] = []
+    threads = [
+        threading.Thread(target=lambda: results.append(server.query("/slow", {})))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [b'{"ok": true}'] * 4
+
+
+def _get(path: str, query) -> tuple[int, bytes, ResponseCache]:
+    cache = ResponseCache()
+    handler = QueryHandler.__new__(QueryHandler)
+    handler.path = path
+    handler.server = SimpleNamespace(cache=cache, query=query)
+    handler.request_version = "HTTP/1.1"
+    handler.requestline = f"GET {path} HTTP/1.1"
+    handler.wfile = io.BytesIO()
+    handler.do_GET()
+    status = int(handler.wfile.getvalue().split(b" ", 2)[1])
+    body = handler.wfile.getvalue().split(b"\r\n\r\n", 1)[1]
+    return status, body, cache
+
+
+def _raise(error: Exception):
+    def query(path, params):
+        raise error
+
+    return query
+
+
+def test_handler_maps_bad_parameters_to_400():
+    status, body, cache = _get("/vacancies?limit=x", _raise(ValueError("limit")))
+    assert status == 400
+    assert b"limit" in body
+
+
+def test_handler_maps_other_errors_to_500():
+    error = psycopg2.ProgrammingError('relation "vacancy_snapshots" does not exist')
+    status, body, cache = _get("/trends/count", _raise(error))
+    assert status == 500
+    assert body == b'{"error": "internal server error"}'
+    assert cache.get("/trends/count") is None
+
+
+def test_handler_caches_successful_response():
+    status, body, cache = _get("/salary/avg", lambda path, params: b"{}")
+    assert status == 200
+    assert cache.get("/salary/avg") == b"{}"
+
+
+def _wait_for(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "условие не выполнилось"
+        time.sleep(0.02)
+
+
+def _listener_pids(conn) -> list[int]:
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT pid FROM pg_stat_activity WHERE query = %s",
+            (f"LISTEN {DATA_LOADED_CHANNEL}",),
+        )
+        return [pid for (pid,) in cur.fetchall()]
+
+
+def test_listener_reconnects_after_connection_loss(pg_conn, pg_database):
+    config = load_config()
+    server = QueryServer.__new__(QueryServer)
+    server.db_params = {
+        "dbname": pg_database,
+        "user": config["user"],
+        "password": config["password"],
+        "host": config["host"],
+        "port": config["port"],
+    }
+    server.cache = ResponseCache()
+    server._stopped = threading.Event()
+    server.listen_poll = 0.05
+    server.listen_backoff = (0.05, 0.1)
+    listener = threading.Thread(target=server._listen, daemon=True)
+    listener.start()
+    try:
+        _wait_for(lambda: len(_listener_pids(pg_conn)) == 1)
+        (pid,) = _listener_pids(pg_conn)
+        server.cache.put("/companies", b"[]")
+
+        with pg_conn.cursor() as cur:
+            cur.execute("SELECT pg_terminate_backend(%s)", (pid,))
+        _wait_for(lambda: _listener_pids(pg_conn) not in ([], [pid]))
+        # уведомления за время обрыва потеряны, поэтому кэш очищается
+        _wait_for(lambda: server.cache.get("/companies") is None)
+
+        server.cache.put("/companies", b"[]")
+        with pg_conn.cursor() as cur:
+            cur.execute(f"NOTIFY {DATA_LOADED_CHANNEL}")
+        _wait_for(lambda: server.cache.get("/companies") is None)
+    finally:
+        server._stopped.set()
+        listener.join(timeout=5)
+    assert not listener.is_alive()
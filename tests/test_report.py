@@ -0,0 +1,91 @@
+import json
+
+import pytest
+
+from src import report
+from src.db_manager import DBManager
+from src.db_setup import create_tables
+from tests.fakes import FakeConnection
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    """Подменяет соединение отчёта на FakeConnection."""
+    conn = FakeConnection()
+    monkeypatch.setattr(report, "DBManager", lambda: DBManager(conn=conn))
+    monkeypatch.setattr(report, "schema_is_current", lambda cur: True)
+    return conn
+
+
+@pytest.mark.parametrize("keyword", [None, ""])
+def test_keyword_report_requires_keyword(fake_db, keyword, capsys):
+    assert report.run_report("keyword", keyword=keyword) == 2
+    assert "--keyword" in capsys.readouterr().err
+    assert fake_db.executed == []
+
+
+def test_unknown_report(fake_db):
+    assert report.run_report("missing") == 2
+
+
+def test_limit_is_passed_to_sql(fake_db):
+    report.run_report("keyword", fmt="csv", keyword="Python", limit=5)
+
+    _, sql, _ = fake_db.executed[-1]
+    assert sql.rstrip().endswith("LIMIT %s")
+    assert fake_db.params[-1] == ("%Python%", 5)
+
+
+def test_without_limit_query_is_unchanged(fake_db):
+    report.run_report("companies", fmt="csv")
+
+    _, sql, _ = fake_db.executed[-1]
+    assert "LIMIT" not in sql
+    assert fake_db.params[-1] is None
+
+
+@pytest.mark.parametrize(
+    "name, method",
+    [
+        ("salary_trend", "get_salary_trend_by_employer"),
+        ("count_trend", "get_vacancy_count_trend"),
+    ],
+)
+def test_trend_reports_use_dbmanager_defaults(fake_db, name, method):
+    direct = FakeConnection()
+    getattr(DBManager(conn=direct), method)()
+
+    report.run_report(name, fmt="csv", limit=7)
+
+    assert fake_db.executed[-1][1].rstrip().endswith("LIMIT %s")
+    assert fake_db.params[-1] == (*direct.params[-1], 7)
+
+
+def test_limited_report_on_database(pg_conn, monkeypatch, capsys):
+    create_tables()
+    monkeypatch.setattr(report, "DBManager", lambda: DBManager(conn=pg_conn))
+    DBManager(conn=pg_conn).insert_data(
+        {
+            "employers": [
+                {"employer_id": "1", "name": "E", "url": "u", "open_vacancies": 3}
+            ],
+            "vacancies": [
+                {
+                    "vacancy_id": str(i),
+                    "employer_id": "1",
+                    "name": f"Python {i}",
+                    "salary_from": 1000 * i,
+                    "salary_to": None,
+                    "salary_currency": "RUR",
+                    "url": "u",
+                }
+                for i in range(1, 4)
+            ],
+        }
+    )
+
+    capsys.readouterr()
+    assert report.run_report("keyword", "json", keyword="python", limit=2) == 0
+
+    rows = json.loads(capsys.readouterr().out)
+    assert [row["Вакансия"] for row in rows] == ["Python 3", "Python 2"]